@@ -18,6 +18,7 @@ from .models import (
     DurabilityType,
 )
 from .manager import KnowledgeGraphManager
+from .sqlite_manager import SQLiteKnowledgeGraphManager
 from .server import mcp
 
 __all__ = [
@@ -28,5 +29,6 @@ __all__ = [
     "KnowledgeGraph",
     "DurabilityType",
     "KnowledgeGraphManager",
+    "SQLiteKnowledgeGraphManager",
     "mcp",
 ]
\ No newline at end of file
@@ -5,12 +5,17 @@ This module contains the core business logic for managing the knowledge graph,
 including CRUD operations, temporal observation handling, and smart cleanup.
 """
 
-import json
+import asyncio
+import logging
+import mmap
 import os
 from datetime import datetime, timedelta
-from typing import List, Union, Dict, Set
+from typing import List, Union, Dict, Set, Optional, Tuple, Iterator
 from pathlib import Path
 
+import orjson
+from pydantic import TypeAdapter
+
 from .models import (
     Entity,
     Relation,
@@ -25,6 +30,109 @@ from .models import (
     DurabilityType,
 )
 
+logger = logging.getLogger("iq-mcp")
+
+# Age after which an observation of each durability is considered outdated
+# (permanent observations never are)
+_MAX_AGE = {
+    DurabilityType.LONG_TERM: timedelta(days=30 * 24),  # 2+ years old
+    DurabilityType.SHORT_TERM: timedelta(days=30 * 6),  # 6+ months old
+    DurabilityType.TEMPORARY: timedelta(days=30),       # 1+ month old
+}
+
+# Written as the first line of the store; files carrying the current version
+# were produced by this module and are loaded without re-validation
+_SCHEMA_VERSION = 1
+_META_RECORD = {"type": "meta", "version": _SCHEMA_VERSION}
+
+# Compiled once and reused for every line loaded from storage
+_ENTITY_ADAPTER = TypeAdapter(Entity)
+_RELATION_ADAPTER = TypeAdapter(Relation)
+_OBSERVATION_ADAPTER = TypeAdapter(TimestampedObservation)
+
+# Graphs with at least this many entities get a trigram index for search_nodes;
+# below it a plain scan of the lowercase text is faster than intersecting postings
+_TRIGRAM_MIN_ENTITIES = 1000
+
+
+class _SearchIndex:
+    """
+    Lowercase search text of every entity, with an optional trigram index.
+    
+    Entities are addressed by their position in the graph, which only changes
+    on full rewrites (and those rebuild the index).
+    """
+    
+    def __init__(self, entities: List[Entity], use_trigrams: bool):
+        self.entities: List[Entity] = []
+        self.texts: List[str] = []
+        self.positions: Dict[int, int] = {}  # id(entity) -> position
+        self.trigrams: Optional[Dict[str, Set[int]]] = {} if use_trigrams else None
+        for entity in entities:
+            self.add(entity)
+    
+    @staticmethod
+    def _search_text(entity: Entity) -> str:
+        """
+        Lowercase an entity's name, type and observation contents into one string.
+        
+        Fields are joined with NUL so a single substring test covers all of them.
+        """
+        parts = [entity.name, entity.entity_type]
+        parts.extend(obs.content for obs in entity.observations)
+        return "\0".join(parts).lower()
+    
+    def _index_trigrams(self, position: int, text: str) -> None:
+        """Add every trigram of the text to its posting set."""
+        if self.trigrams is None:
+            return
+        for trigram in {text[i:i + 3] for i in range(len(text) - 2)}:
+            self.trigrams.setdefault(trigram, set()).add(position)
+    
+    def add(self, entity: Entity) -> None:
+        """Index an entity appended to the graph."""
+        position = len(self.entities)
+        text = self._search_text(entity)
+        self.entities.append(entity)
+        self.texts.append(text)
+        self.positions[id(entity)] = position
+        self._index_trigrams(position, text)
+    
+    def update(self, entity: Entity) -> None:
+        """Re-index an entity whose observations grew."""
+        position = self.positions[id(entity)]
+        text = self._search_text(entity)
+        self.texts[position] = text
+        # Text only grows, so existing postings stay valid
+        self._index_trigrams(position, text)
+    
+    def search(self, query_lower: str) -> List[Entity]:
+        """
+        Return entities whose search text contains the query, in graph order.
+        
+        Args:
+            query_lower: Lowercased query without NUL characters
+        """
+        if self.trigrams is not None and len(query_lower) >= 3:
+            postings = []
+            for trigram in {query_lower[i:i + 3] for i in range(len(query_lower) - 2)}:
+                posting = self.trigrams.get(trigram)
+                if posting is None:
+                    return []
+                postings.append(posting)
+            postings.sort(key=len)
+            candidates = postings[0].intersection(*postings[1:])
+            # Trigrams only narrow the candidates; confirm with a substring test
+            return [
+                self.entities[i] for i in sorted(candidates)
+                if query_lower in self.texts[i]
+            ]
+        
+        return [
+            entity for entity, text in zip(self.entities, self.texts)
+            if query_lower in text
+        ]
+
 
 class KnowledgeGraphManager:
     """
@@ -35,18 +143,44 @@ class KnowledgeGraphManager:
     features for smart memory management.
     """
     
-    def __init__(self, memory_file_path: str):
+    def __init__(self, memory_file_path: str, strict_load: bool = False, batch_size: int = 1, fsync: bool = False):
         """
         Initialize the knowledge graph manager.
         
         Args:
             memory_file_path: Path to the JSONL file for persistent storage
+            strict_load: Validate every record on load, even in files written
+                by the current schema version (useful for migrations)
+            batch_size: Buffer appended records until this many are pending;
+                `flush` writes them sooner (1 writes on every change)
+            fsync: Sync appended records to disk on every flush
         """
         self.memory_file_path = Path(memory_file_path)
+        self.strict_load = strict_load
+        self.batch_size = max(1, batch_size)
+        self.fsync = fsync
+        # Records already applied to the cached graph but not yet written
+        self._pending: List[dict] = []
         # Ensure the directory exists
         self.memory_file_path.parent.mkdir(parents=True, exist_ok=True)
+        # Last loaded/saved graph, valid while the file's (mtime_ns, size) is unchanged
+        self._cache: Optional[KnowledgeGraph] = None
+        self._cache_key: Optional[Tuple[int, int]] = None
+        # Held while the storage file is read or written, so loads never see a
+        # write in progress
+        self._file_lock = asyncio.Lock()
+        # Serializes load-mutate-write sequences
+        self._write_lock = asyncio.Lock()
+        # Lookup structures for the graph they were built from
+        self._indexed_graph: Optional[KnowledgeGraph] = None
+        self._entity_index: Optional[Dict[str, Entity]] = None
+        self._relation_keys: Optional[Set[Tuple[str, str, str]]] = None
+        self._content_sets: Dict[str, Set[str]] = {}
+        self._search_index: Optional[_SearchIndex] = None
+        # JSON text of the whole graph and the storage key it was encoded for
+        self._graph_json: Optional[Tuple[Tuple[int, int], str]] = None
     
-    def _create_timestamped_observation(self, input_data:str | ObservationInput) -> TimestampedObservation:
+    def _create_timestamped_observation(self, input_data:str | ObservationInput, now: Optional[datetime] = None) -> TimestampedObservation:
         """
         Create a timestamped observation from input.
         
@@ -55,6 +189,7 @@ class KnowledgeGraphManager:
         
         Args:
             input_data: Either a string or ObservationInput object
+            now: Naive local time shared by a batch (defaults to the current time)
             
         Returns:
             TimestampedObservation with current timestamp
@@ -63,16 +198,18 @@ class KnowledgeGraphManager:
             # Convert old string format with default durability
             return TimestampedObservation.create_now(
                 content=input_data,
-                durability=DurabilityType.LONG_TERM
+                durability=DurabilityType.LONG_TERM,
+                now=now
             )
         
         # Handle ObservationInput object
         return TimestampedObservation.create_now(
             content=input_data.content,
-            durability=input_data.durability or DurabilityType.LONG_TERM
+            durability=input_data.durability or DurabilityType.LONG_TERM,
+            now=now
         )
     
-    def _normalize_observation(self, obs: Union[str, TimestampedObservation]) -> TimestampedObservation:
+    def _normalize_observation(self, obs: Union[str, TimestampedObservation], now: Optional[datetime] = None) -> TimestampedObservation:
         """
         Normalize observations to TimestampedObservation format.
         
@@ -81,117 +218,504 @@ class KnowledgeGraphManager:
         
         Args:
             obs: Either a string or TimestampedObservation
+            now: Naive local time shared by a batch (defaults to the current time)
             
         Returns:
             TimestampedObservation with appropriate metadata
         """
         if isinstance(obs, str):
-            return self._create_timestamped_observation(obs)
+            return self._create_timestamped_observation(obs, now)
         return obs
     
-    def _is_observation_outdated(self, obs: TimestampedObservation) -> bool:
+    @staticmethod
+    def _outdated_cutoffs(now: datetime) -> Dict[DurabilityType, datetime]:
+        """
+        Compute, once per pass, the timestamp before which each durability is outdated.
+        
+        Args:
+            now: Timezone-aware reference time
+            
+        Returns:
+            Cutoff per durability type; permanent observations have none
+        """
+        return {durability: now - max_age for durability, max_age in _MAX_AGE.items()}
+    
+    def _is_observation_outdated(self, obs: TimestampedObservation, cutoffs: Dict[DurabilityType, datetime]) -> bool:
         """
         Check if an observation is likely outdated based on durability and age.
         
         Args:
             obs: The observation to check
+            cutoffs: Cutoffs from `_outdated_cutoffs`
             
         Returns:
             True if the observation should be considered outdated
         """
-        try:
-            now = datetime.now()
-            obs_date = datetime.fromisoformat(obs.timestamp.replace('Z', '+00:00'))
-            days_old = (now - obs_date).days
-            months_old = days_old / 30.0
-            
-            if obs.durability == DurabilityType.PERMANENT:
-                return False  # Never outdated
-            elif obs.durability == DurabilityType.LONG_TERM:
-                return months_old > 24  # 2+ years old
-            elif obs.durability == DurabilityType.SHORT_TERM:
-                return months_old > 6   # 6+ months old
-            elif obs.durability == DurabilityType.TEMPORARY:
-                return months_old > 1   # 1+ month old
-            else:
-                return False
-        except (ValueError, AttributeError):
+        cutoff = cutoffs.get(obs.durability)
+        if cutoff is None:
+            return False  # Permanent observations never expire
+        obs_date = obs.parsed_timestamp
+        if obs_date is None:
             # If timestamp parsing fails, assume not outdated
             return False
+        return obs_date < cutoff
+    
+    def _file_key(self) -> Optional[Tuple[int, int]]:
+        """Return the (mtime_ns, size) of the storage file, or None if it doesn't exist."""
+        try:
+            st = self.memory_file_path.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+    
+    def _update_cache(self, graph: KnowledgeGraph) -> None:
+        """Remember a graph that was just written to storage."""
+        self._cache = graph
+        self._cache_key = self._file_key()
+    
+    def _invalidate_cache(self) -> None:
+        """Forget the cached graph so the next load re-reads storage."""
+        self._cache = None
+        self._cache_key = None
+        self._reset_indexes()
+    
+    def _reset_indexes(self) -> None:
+        """Drop lookup structures so they are rebuilt on next use."""
+        self._indexed_graph = None
+        self._entity_index = None
+        self._relation_keys = None
+        self._content_sets = {}
+        self._search_index = None
+    
+    def _use_indexes_for(self, graph: KnowledgeGraph) -> None:
+        """Drop lookup structures built for a different graph instance."""
+        if self._indexed_graph is not graph:
+            self._reset_indexes()
+            self._indexed_graph = graph
+    
+    def _index_entities(self, graph: KnowledgeGraph) -> Dict[str, Entity]:
+        """
+        Return a name -> Entity index for the graph.
+        
+        The index is kept alongside the cached graph and maintained in place by
+        every mutation. When names repeat, the first entity wins, matching a
+        linear scan.
+        
+        Args:
+            graph: The graph to index
+            
+        Returns:
+            Dict mapping entity names to entities
+        """
+        self._use_indexes_for(graph)
+        if self._entity_index is None:
+            index: Dict[str, Entity] = {}
+            for entity in graph.entities:
+                index.setdefault(entity.name, entity)
+            self._entity_index = index
+        return self._entity_index
+    
+    def _observation_contents(self, graph: KnowledgeGraph, entity: Entity) -> Set[str]:
+        """
+        Return the set of observation contents of an entity, for duplicate checks.
+        
+        Sets are built on first use per entity name and maintained in place;
+        operations that remove observations update or drop them.
+        
+        Args:
+            graph: The graph the entity belongs to
+            entity: The entity, as found through `_index_entities`
+            
+        Returns:
+            Set of observation contents
+        """
+        self._use_indexes_for(graph)
+        contents = self._content_sets.get(entity.name)
+        if contents is None:
+            contents = {obs.content for obs in entity.observations}
+            self._content_sets[entity.name] = contents
+        return contents
+    
+    async def _index_search_text(self, graph: KnowledgeGraph) -> "_SearchIndex":
+        """
+        Return the search index of the graph, building it on first use.
+        
+        Appends keep the index current; full rewrites drop it so it is rebuilt
+        on the next search. The build runs in a worker thread under the write
+        lock, so it neither blocks the event loop nor misses a concurrent write.
+        
+        Args:
+            graph: The graph to index
+            
+        Returns:
+            The graph's search index
+        """
+        self._use_indexes_for(graph)
+        index = self._search_index
+        if index is None:
+            async with self._write_lock:
+                # Another search may have built it while we waited
+                index = self._search_index if self._indexed_graph is graph else None
+                if index is None:
+                    index = await asyncio.to_thread(
+                        _SearchIndex,
+                        graph.entities,
+                        len(graph.entities) >= _TRIGRAM_MIN_ENTITIES,
+                    )
+                    # Keep it unless the graph was reloaded meanwhile; this search
+                    # can still use it either way
+                    if self._indexed_graph is graph:
+                        self._search_index = index
+        return index
+    
+    @staticmethod
+    def _relation_key(relation: Relation) -> Tuple[str, str, str]:
+        """Return the identity of a relation used for duplicate checks."""
+        return (relation.from_entity, relation.to_entity, relation.relation_type)
+    
+    def _index_relations(self, graph: KnowledgeGraph) -> Set[Tuple[str, str, str]]:
+        """
+        Return the set of relation keys present in the graph.
+        
+        Like the entity index, the set lives alongside the cached graph and is
+        maintained in place by every mutation.
+        
+        Args:
+            graph: The graph to index
+            
+        Returns:
+            Set of (from, to, relationType) tuples
+        """
+        self._use_indexes_for(graph)
+        if self._relation_keys is None:
+            self._relation_keys = {self._relation_key(r) for r in graph.relations}
+        return self._relation_keys
     
     async def _load_graph(self) -> KnowledgeGraph:
         """
-        Load the knowledge graph from JSONL storage.
+        Load the knowledge graph, reusing the cached copy while storage is unchanged.
+        
+        The returned graph is shared with the cache: callers that mutate it must
+        persist the result with ``_save_graph`` or ``_append_records``. Parsing
+        on a cache miss runs in a worker thread.
         
         Returns:
             KnowledgeGraph loaded from file, or empty graph if file doesn't exist
         """
-        if not self.memory_file_path.exists():
-            return KnowledgeGraph()
+        async with self._file_lock:
+            key = self._file_key()
+            if self._cache is not None and key == self._cache_key:
+                return self._cache
+            
+            # Storage changed underneath us; don't lose buffered records
+            if self._pending:
+                await self._flush_locked()
+                key = self._file_key()
+            if key is None:
+                return KnowledgeGraph()
+            
+            graph = await asyncio.to_thread(self._load_graph_sync)
+            self._cache = graph
+            self._cache_key = key
+            return graph
+    
+    @staticmethod
+    def _iter_lines(mm: mmap.mmap) -> Iterator[Tuple[int, bytes]]:
+        """
+        Yield (offset, line) for every non-blank line of a mapped file.
+        
+        Lines are sliced straight out of the mapping, without decoding or
+        splitting the whole file up front; a trailing carriage return is dropped.
+        """
+        pos = 0
+        end = len(mm)
+        while pos < end:
+            newline = mm.find(b'\n', pos)
+            if newline == -1:
+                newline = end
+            line = mm[pos:newline]
+            offset = pos
+            pos = newline + 1
+            
+            if line.endswith(b'\r'):
+                line = line[:-1]
+            if not line or line.isspace():
+                continue
+            yield offset, line
+    
+    def _load_graph_sync(self) -> KnowledgeGraph:
+        """
+        Parse the knowledge graph from JSONL storage.
+        
+        Observation records appended by ``add_observations`` are merged back into
+        their entities, so callers always see the same shape ``_save_graph`` writes.
         
+        Returns:
+            KnowledgeGraph loaded from file, or empty graph if it can't be read
+        """
         try:
             entities = []
             relations = []
+            observation_records = []
+            trusted = False
             
-            with open(self.memory_file_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    
+            with open(self.memory_file_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return KnowledgeGraph()
+                # The mapping stays valid after the file object is closed
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            
+            try:
+                for offset, line in self._iter_lines(mm):
                     try:
-                        item = json.loads(line)
-                        if item.get("type") == "entity":
-                            # Remove the type field and create Entity
-                            entity_data = {k: v for k, v in item.items() if k != "type"}
-                            entity = Entity(**entity_data)
-                            # Normalize observations when loading
-                            entity.observations = [
-                                self._normalize_observation(obs) for obs in entity.observations
-                            ]
-                            entities.append(entity)
+                        item = orjson.loads(line)
+                        if item.get("type") == "meta":
+                            # Only a header on the first line vouches for the whole file
+                            trusted = (
+                                offset == 0
+                                and not self.strict_load
+                                and item.get("version") == _SCHEMA_VERSION
+                            )
+                        elif item.get("type") == "entity":
+                            entities.append(self._entity_from_record(item, trusted))
                         elif item.get("type") == "relation":
-                            # Remove the type field and create Relation
-                            relation_data = {k: v for k, v in item.items() if k != "type"}
-                            relations.append(Relation(**relation_data))
-                    except (json.JSONDecodeError, ValueError) as e:
+                            relations.append(self._relation_from_record(item, trusted))
+                        elif item.get("type") == "observation":
+                            # Merged into their entity once all entities are known
+                            observation_records.append(
+                                (item["entityName"], self._observation_from_record(item, trusted))
+                            )
+                    except (orjson.JSONDecodeError, ValueError, KeyError) as e:
                         # Skip invalid lines but continue processing
-                        print(f"Warning: Skipping invalid line in {self.memory_file_path}: {e}")
+                        logger.warning("Skipping invalid line in %s: %s", self.memory_file_path, e)
+                        continue
+            finally:
+                mm.close()
+            
+            if observation_records:
+                # First entity wins on repeated names, like every other lookup
+                entities_by_name: Dict[str, Entity] = {}
+                for entity in entities:
+                    entities_by_name.setdefault(entity.name, entity)
+                for entity_name, obs in observation_records:
+                    entity = entities_by_name.get(entity_name)
+                    if entity is None:
+                        logger.warning("Skipping observation for unknown entity %s in %s", entity_name, self.memory_file_path)
                         continue
+                    entity.observations.append(obs)
             
-            return KnowledgeGraph(entities=entities, relations=relations)
+            return KnowledgeGraph.model_construct(entities=entities, relations=relations)
             
         except Exception as e:
-            print(f"Error loading graph: {e}")
+            logger.error("Error loading graph: %s", e)
             return KnowledgeGraph()
     
+    def _entity_from_record(self, item: dict, trusted: bool) -> Entity:
+        """
+        Build an entity from its JSONL record, normalizing its observations.
+        
+        Args:
+            item: The parsed record
+            trusted: Skip validation because the file was written by this schema version
+        """
+        if trusted:
+            return Entity.model_construct(
+                name=item["name"],
+                entity_type=item["entityType"],
+                observations=[
+                    self._observation_from_record(obs, trusted) if isinstance(obs, dict)
+                    else self._normalize_observation(obs)
+                    for obs in item.get("observations", [])
+                ],
+            )
+        
+        # Remove the type field and create Entity
+        entity_data = {k: v for k, v in item.items() if k != "type"}
+        entity = _ENTITY_ADAPTER.validate_python(entity_data)
+        # Normalize observations when loading
+        entity.observations = [
+            self._normalize_observation(obs) for obs in entity.observations
+        ]
+        return entity
+    
+    @staticmethod
+    def _relation_from_record(item: dict, trusted: bool) -> Relation:
+        """Build a relation from its JSONL record."""
+        if trusted:
+            return Relation.model_construct(
+                from_entity=item["from"],
+                to_entity=item["to"],
+                relation_type=item["relationType"],
+            )
+        # Remove the type field and create Relation
+        relation_data = {k: v for k, v in item.items() if k != "type"}
+        return _RELATION_ADAPTER.validate_python(relation_data)
+    
+    @staticmethod
+    def _observation_from_record(item: dict, trusted: bool) -> TimestampedObservation:
+        """Build an observation from an inline or standalone JSONL record."""
+        if trusted:
+            return TimestampedObservation.model_construct(
+                content=item["content"],
+                timestamp=item["timestamp"],
+                durability=DurabilityType(item["durability"]),
+            )
+        obs_data = {k: v for k, v in item.items() if k not in ("type", "entityName")}
+        return _OBSERVATION_ADAPTER.validate_python(obs_data)
+    
+    @staticmethod
+    def _entity_record(entity: Entity) -> dict:
+        """Serialize an entity to its JSONL record."""
+        entity_dict = entity.model_dump(by_alias=True, mode="json")
+        entity_dict["type"] = "entity"
+        return entity_dict
+    
+    @staticmethod
+    def _relation_record(relation: Relation) -> dict:
+        """Serialize a relation to its JSONL record."""
+        relation_dict = relation.model_dump(by_alias=True, mode="json")
+        relation_dict["type"] = "relation"
+        return relation_dict
+    
+    @staticmethod
+    def _observation_record(entity_name: str, obs: TimestampedObservation) -> dict:
+        """Serialize an observation appended to an existing entity to its JSONL record."""
+        obs_dict = obs.model_dump(mode="json")
+        obs_dict["type"] = "observation"
+        obs_dict["entityName"] = entity_name
+        return obs_dict
+    
     async def _save_graph(self, graph: KnowledgeGraph) -> None:
         """
         Save the knowledge graph to JSONL storage.
         
+        This rewrites the whole file and is reserved for deletions and cleanup.
+        It also compacts the store: observation records appended since the last
+        rewrite are folded back into their entity records. The blocking work
+        runs in a worker thread.
+        
         Args:
             graph: The knowledge graph to save
         """
+        async with self._file_lock:
+            # Write buffered records first so a failed rewrite can't lose them
+            await self._flush_locked()
+            try:
+                await asyncio.to_thread(self._save_graph_sync, graph)
+            except Exception as e:
+                self._invalidate_cache()
+                raise RuntimeError(f"Failed to save graph: {e}")
+            
+            # Rewrites remove entities or observations; rebuild search text lazily
+            self._search_index = None
+            self._update_cache(graph)
+    
+    def _save_graph_sync(self, graph: KnowledgeGraph) -> None:
+        """
+        Serialize the graph and replace the storage file with it.
+        
+        The new contents are written to a temporary sibling file, synced, and
+        swapped in with ``os.replace`` so a crash never leaves a partial store.
+        
+        Args:
+            graph: The knowledge graph to save
+        """
+        tmp_path = self.memory_file_path.with_suffix(self.memory_file_path.suffix + '.tmp')
         try:
-            lines = []
+            # One growing buffer instead of a list of lines plus a joined copy
+            buffer = bytearray(orjson.dumps(_META_RECORD, option=orjson.OPT_APPEND_NEWLINE))
             
             # Save entities
             for entity in graph.entities:
-                entity_dict = entity.dict(by_alias=True)
-                entity_dict["type"] = "entity"
-                lines.append(json.dumps(entity_dict, separators=(',', ':')))
+                buffer += orjson.dumps(self._entity_record(entity), option=orjson.OPT_APPEND_NEWLINE)
             
             # Save relations  
             for relation in graph.relations:
-                relation_dict = relation.dict(by_alias=True)
-                relation_dict["type"] = "relation"
-                lines.append(json.dumps(relation_dict, separators=(',', ':')))
+                buffer += orjson.dumps(self._relation_record(relation), option=orjson.OPT_APPEND_NEWLINE)
             
-            with open(self.memory_file_path, 'w', encoding='utf-8') as f:
-                f.write('\n'.join(lines))
-                
+            with open(tmp_path, 'wb', buffering=1 << 20) as f:
+                f.write(buffer)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.memory_file_path)
+        except Exception:
+            tmp_path.unlink(missing_ok=True)
+            raise
+    
+    async def _append_records(self, graph: KnowledgeGraph, records: List[dict]) -> None:
+        """
+        Append records to JSONL storage without rewriting existing lines.
+        
+        Records are buffered and written once `batch_size` of them are pending,
+        or on `flush`. The cached graph already reflects them in the meantime.
+        
+        Args:
+            graph: The in-memory graph, already updated with the appended records
+            records: Serialized records (including their "type" field) to append
+        """
+        if not records:
+            return
+        
+        async with self._file_lock:
+            # A graph created for a missing file isn't cached yet; keep it so
+            # reads see the buffered changes
+            self._cache = graph
+            self._graph_json = None
+            self._pending.extend(records)
+            if len(self._pending) >= self.batch_size:
+                await self._flush_locked()
+    
+    async def flush(self) -> None:
+        """
+        Write buffered records to storage.
+        
+        Raises:
+            RuntimeError: If writing fails; the buffered changes are dropped
+                and the graph is reloaded from storage on next use
+        """
+        async with self._file_lock:
+            await self._flush_locked()
+    
+    async def _flush_locked(self) -> None:
+        """Write buffered records; the caller holds ``_file_lock``."""
+        if not self._pending:
+            return
+        
+        records, self._pending = self._pending, []
+        try:
+            await asyncio.to_thread(self._append_records_sync, records)
         except Exception as e:
-            raise RuntimeError(f"Failed to save graph: {e}")
+            self._invalidate_cache()
+            raise RuntimeError(f"Failed to append to graph: {e}")
+        
+        if self._cache is not None:
+            self._update_cache(self._cache)
+    
+    def _append_records_sync(self, records: List[dict]) -> None:
+        """
+        Append serialized records to the storage file.
+        
+        Args:
+            records: Serialized records (including their "type" field) to append
+        """
+        # Files written by older versions have no trailing newline
+        needs_newline = False
+        is_new_file = not self.memory_file_path.exists() or self.memory_file_path.stat().st_size == 0
+        if not is_new_file:
+            with open(self.memory_file_path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b'\n'
+        
+        with open(self.memory_file_path, 'ab', buffering=1 << 20) as f:
+            if is_new_file:
+                f.write(orjson.dumps(_META_RECORD, option=orjson.OPT_APPEND_NEWLINE))
+            if needs_newline:
+                f.write(b'\n')
+            for record in records:
+                f.write(orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE))
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
     
     async def create_entities(self, entities: List[Entity]) -> List[Entity]:
         """
@@ -203,17 +727,29 @@ class KnowledgeGraphManager:
         Returns:
             List of entities that were actually created (excludes existing names)
         """
-        graph = await self._load_graph()
-        existing_names = {entity.name for entity in graph.entities}
-        
-        new_entities = [
-            entity for entity in entities 
-            if entity.name not in existing_names
-        ]
-        
-        graph.entities.extend(new_entities)
-        await self._save_graph(graph)
-        return new_entities
+        async with self._write_lock:
+            graph = await self._load_graph()
+            index = self._index_entities(graph)
+            
+            new_entities = [
+                entity for entity in entities 
+                if entity.name not in index
+            ]
+            
+            # Normalize up front so the cached graph matches what a reload would produce
+            now = datetime.now()
+            for entity in new_entities:
+                entity.observations = [
+                    self._normalize_observation(obs, now) for obs in entity.observations
+                ]
+            
+            graph.entities.extend(new_entities)
+            for entity in new_entities:
+                index.setdefault(entity.name, entity)
+                if self._search_index is not None:
+                    self._search_index.add(entity)
+            await self._append_records(graph, [self._entity_record(entity) for entity in new_entities])
+            return new_entities
     
     async def create_relations(self, relations: List[Relation]) -> List[Relation]:
         """
@@ -225,22 +761,19 @@ class KnowledgeGraphManager:
         Returns:
             List of relations that were actually created (excludes duplicates)
         """
-        graph = await self._load_graph()
-        
-        # Create set of existing relations for duplicate checking
-        existing_relations = {
-            (r.from_entity, r.to_entity, r.relation_type) 
-            for r in graph.relations
-        }
-        
-        new_relations = [
-            relation for relation in relations
-            if (relation.from_entity, relation.to_entity, relation.relation_type) not in existing_relations
-        ]
-        
-        graph.relations.extend(new_relations)
-        await self._save_graph(graph)
-        return new_relations
+        async with self._write_lock:
+            graph = await self._load_graph()
+            existing_relations = self._index_relations(graph)
+            
+            new_relations = [
+                relation for relation in relations
+                if self._relation_key(relation) not in existing_relations
+            ]
+            
+            graph.relations.extend(new_relations)
+            existing_relations.update(self._relation_key(relation) for relation in new_relations)
+            await self._append_records(graph, [self._relation_record(relation) for relation in new_relations])
+            return new_relations
     
     async def add_observations(self, requests: List[AddObservationRequest]) -> List[AddObservationResult]:
         """
@@ -255,93 +788,100 @@ class KnowledgeGraphManager:
         Raises:
             ValueError: If an entity is not found
         """
-        graph = await self._load_graph()
-        results = []
-        
-        for request in requests:
-            # Find the entity
-            entity = next((e for e in graph.entities if e.name == request.entity_name), None)
-            if entity is None:
-                raise ValueError(f"Entity with name {request.entity_name} not found")
-            
-            # Convert all input contents to TimestampedObservation format
-            new_timestamped_obs = [
-                self._create_timestamped_observation(content) 
-                for content in request.contents
-            ]
+        async with self._write_lock:
+            graph = await self._load_graph()
+            results = []
+            records = []
             
-            # Get existing observation contents for duplicate checking
-            existing_contents = {
-                obs.content if isinstance(obs, TimestampedObservation) else obs
-                for obs in entity.observations
-            }
-            
-            # Filter out duplicates
-            unique_new_obs = [
-                obs for obs in new_timestamped_obs
-                if obs.content not in existing_contents
-            ]
+            # Check every entity before touching the (cached) graph
+            index = self._index_entities(graph)
+            for request in requests:
+                if request.entity_name not in index:
+                    raise ValueError(f"Entity with name {request.entity_name} not found")
             
-            # Add new observations
-            entity.observations.extend(unique_new_obs)
+            # One timestamp for the whole batch
+            now = datetime.now()
+            for request in requests:
+                entity = index[request.entity_name]
+                
+                # Convert all input contents to TimestampedObservation format
+                new_timestamped_obs = [
+                    self._create_timestamped_observation(content, now) 
+                    for content in request.contents
+                ]
+                
+                # Filter out duplicates, including repeats within this request
+                existing_contents = self._observation_contents(graph, entity)
+                unique_new_obs = []
+                for obs in new_timestamped_obs:
+                    if obs.content not in existing_contents:
+                        existing_contents.add(obs.content)
+                        unique_new_obs.append(obs)
+                
+                # Add new observations
+                entity.observations.extend(unique_new_obs)
+                if unique_new_obs and self._search_index is not None:
+                    self._search_index.update(entity)
+                records.extend(self._observation_record(entity.name, obs) for obs in unique_new_obs)
+                
+                results.append(AddObservationResult(
+                    entity_name=request.entity_name,
+                    added_observations=unique_new_obs
+                ))
             
-            results.append(AddObservationResult(
-                entity_name=request.entity_name,
-                added_observations=unique_new_obs
-            ))
-        
-        await self._save_graph(graph)
-        return results
+            await self._append_records(graph, records)
+            return results
     
-    async def cleanup_outdated_observations(self) -> CleanupResult:
+    async def cleanup_outdated_observations(self, max_details: Optional[int] = None) -> CleanupResult:
         """
         Remove observations that are likely outdated based on durability and age.
         
+        Args:
+            max_details: Report details for at most this many removed observations
+                (all of them when None); the removal count is always complete
+        
         Returns:
             CleanupResult with details of what was removed
         """
-        graph = await self._load_graph()
-        total_removed = 0
-        removed_details = []
-        
-        for entity in graph.entities:
-            original_count = len(entity.observations)
+        async with self._write_lock:
+            graph = await self._load_graph()
+            total_removed = 0
+            # (entity name, content, age in days), turned into dicts once at the end
+            removed_details: List[Tuple[str, str, int]] = []
+            now = datetime.now().astimezone()
+            cutoffs = self._outdated_cutoffs(now)
             
-            # Normalize all observations first
-            normalized_obs = [self._normalize_observation(obs) for obs in entity.observations]
+            for entity in graph.entities:
+                original_count = len(entity.observations)
+                
+                # Normalize and filter out outdated observations in one pass
+                kept_observations = []
+                for obs in entity.observations:
+                    obs = self._normalize_observation(obs)
+                    if self._is_observation_outdated(obs, cutoffs):
+                        if max_details is None or len(removed_details) < max_details:
+                            # Outdated implies the timestamp was parsed
+                            age_days = (now - obs.parsed_timestamp).days
+                            removed_details.append((entity.name, obs.content, age_days))
+                    else:
+                        kept_observations.append(obs)
+                
+                if len(kept_observations) != original_count:
+                    self._content_sets.pop(entity.name, None)
+                entity.observations = kept_observations
+                total_removed += original_count - len(kept_observations)
             
-            # Filter out outdated observations
-            kept_observations = []
-            for obs in normalized_obs:
-                if self._is_observation_outdated(obs):
-                    try:
-                        obs_date = datetime.fromisoformat(obs.timestamp.replace('Z', '+00:00'))
-                        age_days = (datetime.now() - obs_date).days
-                        removed_details.append({
-                            "entityName": entity.name,
-                            "content": obs.content,
-                            "age": f"{age_days} days old"
-                        })
-                    except ValueError:
-                        removed_details.append({
-                            "entityName": entity.name,
-                            "content": obs.content,
-                            "age": "unknown age"
-                        })
-                else:
-                    kept_observations.append(obs)
+            if total_removed > 0:
+                await self._save_graph(graph)
             
-            entity.observations = kept_observations
-            total_removed += original_count - len(kept_observations)
-        
-        if total_removed > 0:
-            await self._save_graph(graph)
-        
-        return CleanupResult(
-            entities_processed=len(graph.entities),
-            observations_removed=total_removed,
-            removed_observations=removed_details
-        )
+            return CleanupResult(
+                entities_processed=len(graph.entities),
+                observations_removed=total_removed,
+                removed_observations=[
+                    {"entityName": entity_name, "content": content, "age": f"{age_days} days old"}
+                    for entity_name, content, age_days in removed_details
+                ]
+            )
     
     async def get_observations_by_durability(self, entity_name: str) -> DurabilityGroupedObservations:
         """
@@ -357,25 +897,25 @@ class KnowledgeGraphManager:
             ValueError: If the entity is not found
         """
         graph = await self._load_graph()
-        entity = next((e for e in graph.entities if e.name == entity_name), None)
+        entity = self._index_entities(graph).get(entity_name)
         
         if entity is None:
             raise ValueError(f"Entity {entity_name} not found")
         
-        # Normalize all observations
-        normalized_obs = [self._normalize_observation(obs) for obs in entity.observations]
-        
-        # Group by durability
         grouped = DurabilityGroupedObservations()
-        for obs in normalized_obs:
-            if obs.durability == DurabilityType.PERMANENT:
-                grouped.permanent.append(obs)
-            elif obs.durability == DurabilityType.LONG_TERM:
-                grouped.long_term.append(obs)
-            elif obs.durability == DurabilityType.SHORT_TERM:
-                grouped.short_term.append(obs)
-            elif obs.durability == DurabilityType.TEMPORARY:
-                grouped.temporary.append(obs)
+        groups = {
+            DurabilityType.PERMANENT: grouped.permanent,
+            DurabilityType.LONG_TERM: grouped.long_term,
+            DurabilityType.SHORT_TERM: grouped.short_term,
+            DurabilityType.TEMPORARY: grouped.temporary,
+        }
+        
+        # Normalize and group by durability in one pass
+        for obs in entity.observations:
+            obs = self._normalize_observation(obs)
+            group = groups.get(obs.durability)
+            if group is not None:
+                group.append(obs)
         
         return grouped
     
@@ -386,19 +926,28 @@ class KnowledgeGraphManager:
         Args:
             entity_names: List of entity names to delete
         """
-        graph = await self._load_graph()
-        entity_names_set = set(entity_names)
-        
-        # Remove entities
-        graph.entities = [e for e in graph.entities if e.name not in entity_names_set]
-        
-        # Remove relations involving deleted entities
-        graph.relations = [
-            r for r in graph.relations 
-            if r.from_entity not in entity_names_set and r.to_entity not in entity_names_set
-        ]
-        
-        await self._save_graph(graph)
+        async with self._write_lock:
+            graph = await self._load_graph()
+            index = self._index_entities(graph)
+            relation_keys = self._index_relations(graph)
+            entity_names_set = set(entity_names)
+            
+            # Remove entities
+            graph.entities = [e for e in graph.entities if e.name not in entity_names_set]
+            for name in entity_names_set:
+                index.pop(name, None)
+                self._content_sets.pop(name, None)
+            
+            # Remove relations involving deleted entities
+            kept_relations = []
+            for r in graph.relations:
+                if r.from_entity in entity_names_set or r.to_entity in entity_names_set:
+                    relation_keys.discard(self._relation_key(r))
+                else:
+                    kept_relations.append(r)
+            graph.relations = kept_relations
+            
+            await self._save_graph(graph)
     
     async def delete_observations(self, deletions: List[DeleteObservationRequest]) -> None:
         """
@@ -407,21 +956,24 @@ class KnowledgeGraphManager:
         Args:
             deletions: List of observation deletion requests
         """
-        graph = await self._load_graph()
-        
-        for deletion in deletions:
-            entity = next((e for e in graph.entities if e.name == deletion.entity_name), None)
-            if entity:
-                # Create set of observations to delete
-                to_delete = set(deletion.observations)
-                
-                # Filter out observations that match the deletion content
-                entity.observations = [
-                    obs for obs in entity.observations
-                    if (obs.content if isinstance(obs, TimestampedObservation) else obs) not in to_delete
-                ]
-        
-        await self._save_graph(graph)
+        async with self._write_lock:
+            graph = await self._load_graph()
+            index = self._index_entities(graph)
+            
+            for deletion in deletions:
+                entity = index.get(deletion.entity_name)
+                if entity:
+                    # Create set of observations to delete
+                    to_delete = set(deletion.observations)
+                    
+                    # Filter out observations that match the deletion content
+                    entity.observations = [
+                        obs for obs in entity.observations
+                        if obs.content not in to_delete
+                    ]
+                    self._observation_contents(graph, entity).difference_update(to_delete)
+            
+            await self._save_graph(graph)
     
     async def delete_relations(self, relations: List[Relation]) -> None:
         """
@@ -430,31 +982,55 @@ class KnowledgeGraphManager:
         Args:
             relations: List of relations to delete
         """
-        graph = await self._load_graph()
-        
-        # Create set of relations to delete for efficient lookup
-        to_delete = {
-            (r.from_entity, r.to_entity, r.relation_type) 
-            for r in relations
-        }
-        
-        # Filter out matching relations
-        graph.relations = [
-            r for r in graph.relations
-            if (r.from_entity, r.to_entity, r.relation_type) not in to_delete
-        ]
-        
-        await self._save_graph(graph)
+        async with self._write_lock:
+            graph = await self._load_graph()
+            relation_keys = self._index_relations(graph)
+            
+            # Only keys that are actually present need a rewrite
+            to_delete = {self._relation_key(r) for r in relations} & relation_keys
+            if not to_delete:
+                return
+            relation_keys.difference_update(to_delete)
+            
+            # Filter out matching relations
+            graph.relations = [
+                r for r in graph.relations
+                if self._relation_key(r) not in to_delete
+            ]
+            
+            await self._save_graph(graph)
     
     async def read_graph(self) -> KnowledgeGraph:
         """
         Read the entire knowledge graph.
         
         Returns:
-            The complete knowledge graph
+            The complete knowledge graph (shared with the cache; do not mutate)
         """
         return await self._load_graph()
     
+    async def read_graph_json(self) -> str:
+        """
+        Read the entire knowledge graph as JSON text.
+        
+        The text is kept until storage changes, so repeated reads of an
+        unchanged graph skip serialization.
+        
+        Returns:
+            The complete knowledge graph, encoded with ``model_dump_json``
+        """
+        graph = await self._load_graph()
+        key = self._cache_key
+        if self._graph_json is not None and self._graph_json[0] == key:
+            return self._graph_json[1]
+        
+        text = await asyncio.to_thread(graph.model_dump_json)
+        # Only keep it if storage matches the graph and no write moved it on
+        # while encoding
+        if key is not None and key == self._cache_key and not self._pending:
+            self._graph_json = (key, text)
+        return text
+    
     async def search_nodes(self, query: str) -> KnowledgeGraph:
         """
         Search for nodes in the knowledge graph based on a query.
@@ -468,21 +1044,17 @@ class KnowledgeGraphManager:
         graph = await self._load_graph()
         query_lower = query.lower()
         
-        # Filter entities that match the query
-        filtered_entities = []
-        for entity in graph.entities:
-            # Check entity name and type
-            if (query_lower in entity.name.lower() or 
-                query_lower in entity.entity_type.lower()):
-                filtered_entities.append(entity)
-                continue
-            
-            # Check observations
-            for obs in entity.observations:
-                content = obs.content if isinstance(obs, TimestampedObservation) else obs
-                if query_lower in content.lower():
-                    filtered_entities.append(entity)
-                    break
+        if "\0" in query_lower:
+            # The query could straddle fields in the joined text; check them one by one
+            filtered_entities = [
+                entity for entity in graph.entities
+                if query_lower in entity.name.lower()
+                or query_lower in entity.entity_type.lower()
+                or any(query_lower in obs.content.lower() for obs in entity.observations)
+            ]
+        else:
+            # Filter entities whose name, type or observations contain the query
+            filtered_entities = (await self._index_search_text(graph)).search(query_lower)
         
         # Get names of filtered entities for relation filtering
         filtered_entity_names = {entity.name for entity in filtered_entities}
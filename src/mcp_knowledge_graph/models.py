@@ -7,7 +7,7 @@ including entities, relations, and temporal observations with durability metadat
 
 from datetime import datetime
 from typing import List, Union, Literal, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from enum import Enum
 
 
@@ -32,14 +32,43 @@ class TimestampedObservation(BaseModel):
     timestamp: str = Field(..., description="ISO date string when the observation was created")
     durability: DurabilityType = Field(..., description="How long this observation is expected to remain relevant")
     
+    # Parsed form of `timestamp`, filled on first use and never serialized
+    _parsed_ts: Optional[datetime] = PrivateAttr(default=None)
+    
+    @property
+    def parsed_timestamp(self) -> Optional[datetime]:
+        """
+        The timestamp as a timezone-aware datetime, or None if it can't be parsed.
+        
+        Naive timestamps (the format written by `create_now`) are taken as local time.
+        """
+        if self._parsed_ts is None:
+            try:
+                self._parsed_ts = datetime.fromisoformat(self.timestamp.replace('Z', '+00:00')).astimezone()
+            except (ValueError, AttributeError):
+                return None
+        return self._parsed_ts
+    
     @classmethod
-    def create_now(cls, content: str, durability: DurabilityType = DurabilityType.LONG_TERM) -> "TimestampedObservation":
-        """Create a new timestamped observation with current timestamp."""
-        return cls(
+    def create_now(cls, content: str, durability: DurabilityType = DurabilityType.LONG_TERM, now: Optional[datetime] = None) -> "TimestampedObservation":
+        """
+        Create a new timestamped observation with current timestamp.
+        
+        Args:
+            content: The observation content
+            durability: How long the observation is expected to remain relevant
+            now: Naive local time to stamp it with, so a batch can share one
+                clock read (defaults to the current time)
+        """
+        if now is None:
+            now = datetime.now()
+        obs = cls(
             content=content,
-            timestamp=datetime.now().isoformat(),
+            timestamp=now.isoformat(),
             durability=durability
         )
+        obs._parsed_ts = now.astimezone()
+        return obs
 
 
 class ObservationInput(BaseModel):
@@ -7,20 +7,28 @@ knowledge graph operations as tools for LLM integration using FastMCP 2.11.
 
 import argparse
 import asyncio
+import contextlib
+import functools
 import os
 import sys
 import logging
 
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Union
 
+from cachetools import TTLCache
 from fastmcp import FastMCP
+from pydantic import BaseModel, TypeAdapter, ValidationError
 
 from src.mcp_knowledge_graph.manager import KnowledgeGraphManager
+from src.mcp_knowledge_graph.sqlite_manager import SQLITE_SUFFIXES, SQLiteKnowledgeGraphManager
 from src.mcp_knowledge_graph.models import (
     Entity,
     Relation,
+    KnowledgeGraph,
     AddObservationRequest,
+    AddObservationResult,
     DeleteObservationRequest,
     ObservationInput,
 )
@@ -35,73 +43,241 @@ if IQ_DEBUG:
 
 
 # Memory path can be specified via environment variable
-try:
-    IQ_MEMORY_PATH = Path(os.getenv("IQ_MEMORY_PATH", "memory.jsonl"))
-    logger.debug(f"Memory path: {IQ_MEMORY_PATH}")
-except Exception as e:
-    raise FileNotFoundError(f"Memory path error: {e}")
+IQ_MEMORY_PATH = Path(os.getenv("IQ_MEMORY_PATH", "memory.jsonl"))
+logger.debug("Memory path: %s", IQ_MEMORY_PATH)
 
+# JSONL appends are buffered up to this many records, and written at the latest
+# when the tool call that made them returns
+IQ_WRITE_BATCH = int(os.getenv("IQ_WRITE_BATCH", "1000"))
+# Sync every write to disk (slower, but survives power loss)
+IQ_FSYNC = os.getenv("IQ_FSYNC", "false").lower() == "true"
 
+
+# Relative memory paths (and the default one) are resolved against the package root
+_BASE_DIR = Path(__file__).parent.parent
+
+_PARSER = argparse.ArgumentParser(
+    description="Temporal-Enhanced MCP Knowledge Graph Server"
+)
+_PARSER.add_argument(
+    "--memory-path",
+    type=str,
+    help="Custom path for memory storage (overrides MEMORY_FILE_PATH env var)",
+)
+
+
+@functools.lru_cache(maxsize=1)
 def parse_args() -> argparse.Namespace:
     """Parse command line arguments."""
-    parser = argparse.ArgumentParser(
-        description="Temporal-Enhanced MCP Knowledge Graph Server"
-    )
-    parser.add_argument(
-        "--memory-path",
-        type=str,
-        help="Custom path for memory storage (overrides MEMORY_FILE_PATH env var)",
-    )
-    # Only parse args if running as main script
-    if __name__ == "__main__":
-        return parser.parse_args()
-    else:
-        # Return empty namespace when imported as module
-        return argparse.Namespace(memory_path=None)
+    return _PARSER.parse_args()
 
 
-def get_memory_file_path() -> str:
+def get_memory_file_path(cli_memory_path: Optional[str] = None) -> str:
     """
     Determine memory file path from CLI args, environment, or default.
     
     Priority: CLI args > environment variable > default
-    """
-    args = parse_args()
     
-    # Default path relative to this module
-    default_path = Path(__file__).parent.parent / "memory.json"
-    
-    if args.memory_path:
+    Args:
+        cli_memory_path: Value of --memory-path, if given; the command line is
+            only parsed by the entry points, never on import
+    """
+    if cli_memory_path:
         # CLI argument provided
-        memory_path = Path(args.memory_path)
+        memory_path = Path(cli_memory_path)
         if memory_path.is_absolute():
             return str(memory_path)
         else:
-            return str(Path(__file__).parent.parent / memory_path)
+            return str(_BASE_DIR / memory_path)
     
-    elif os.getenv("MEMORY_FILE_PATH"):
+    env_var = os.getenv("MEMORY_FILE_PATH")
+    if env_var:
         # Environment variable provided
-        env_var = os.getenv("MEMORY_FILE_PATH")
-        if env_var:  # Check for None to satisfy type checker
-            env_path = Path(env_var)
-            if env_path.is_absolute():
-                return str(env_path)
-            else:
-                return str(Path(__file__).parent.parent / env_path)
+        env_path = Path(env_var)
+        if env_path.is_absolute():
+            return str(env_path)
+        else:
+            return str(_BASE_DIR / env_path)
     
     # Use default
-    return str(default_path)
+    return str(_BASE_DIR / "memory.json")
+
+
+def _create_manager(memory_path: str) -> Union[KnowledgeGraphManager, SQLiteKnowledgeGraphManager]:
+    """Create the storage manager for a memory path, picking the backend by file suffix."""
+    if Path(memory_path).suffix.lower() in SQLITE_SUFFIXES:
+        return SQLiteKnowledgeGraphManager(memory_path, fsync=IQ_FSYNC)
+    return KnowledgeGraphManager(memory_path, batch_size=IQ_WRITE_BATCH, fsync=IQ_FSYNC)
+
+
+def _configure_manager(cli_memory_path: Optional[str]) -> None:
+    """
+    Resolve the memory path again and switch the server to it if it changed.
+    
+    Called by the entry points after parsing arguments, so --memory-path and
+    the current environment both apply; importing the module only looks at
+    the environment.
+    """
+    global memory_path, manager
+    resolved = get_memory_file_path(cli_memory_path)
+    if resolved != memory_path:
+        memory_path = resolved
+        manager = _create_manager(memory_path)
+        _bind_manager_methods()
+        _invalidate_read_cache()
+
+
+def _bind_manager_methods() -> None:
+    """
+    Bind the current manager's methods to module globals.
+    
+    Tools call these directly, saving two attribute lookups per call; rebind
+    whenever `manager` is replaced.
+    """
+    global _m_create_entities, _m_create_relations, _m_add_observations
+    global _m_cleanup_outdated_observations, _m_get_observations_by_durability, _m_delete_entities
+    global _m_delete_observations, _m_delete_relations, _m_read_graph, _m_read_graph_json
+    global _m_search_nodes, _m_open_nodes, _m_flush
+    _m_create_entities = manager.create_entities
+    _m_create_relations = manager.create_relations
+    _m_add_observations = manager.add_observations
+    _m_cleanup_outdated_observations = manager.cleanup_outdated_observations
+    _m_get_observations_by_durability = manager.get_observations_by_durability
+    _m_delete_entities = manager.delete_entities
+    _m_delete_observations = manager.delete_observations
+    _m_delete_relations = manager.delete_relations
+    _m_read_graph = manager.read_graph
+    _m_read_graph_json = manager.read_graph_json
+    _m_search_nodes = manager.search_nodes
+    _m_open_nodes = manager.open_nodes
+    _m_flush = manager.flush
 
 
 # Initialize the knowledge graph manager and FastMCP server
 memory_path = get_memory_file_path()
-manager = KnowledgeGraphManager(memory_path)
+manager = _create_manager(memory_path)
+_bind_manager_methods()
 
 # Create FastMCP server instance
 mcp = FastMCP("iq-mcp")
 
+# Compiled once and reused to validate tool arguments and dump results in bulk
+_ENTITY_LIST_ADAPTER = TypeAdapter(List[Entity])
+_RELATION_LIST_ADAPTER = TypeAdapter(List[Relation])
+_DELETION_LIST_ADAPTER = TypeAdapter(List[DeleteObservationRequest])
+_OBS_CONTENTS_ADAPTER = TypeAdapter(List[Union[str, ObservationInput]])
+_OBS_RESULT_LIST_ADAPTER = TypeAdapter(List[AddObservationResult])
+
+# Caps how many write tools are in flight (validating or waiting for their turn)
+# at once; reads are unrestricted
+_WRITE_SEM = asyncio.Semaphore(4)
+
+# Recent get_observations_by_durability / open_nodes results, cleared by every write tool
+_READ_CACHE: TTLCache = TTLCache(maxsize=256, ttl=30)
+# Bumped with every clear, so a read that overlapped a write doesn't cache a stale result
+_read_cache_generation = 0
+
+
+def _invalidate_read_cache() -> None:
+    """Drop cached read results after the graph may have changed."""
+    global _read_cache_generation
+    _read_cache_generation += 1
+    _READ_CACHE.clear()
+
+
+def _invalidates_read_cache(func):
+    """Decorate a write tool implementation to clear the read cache when it finishes."""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            _invalidate_read_cache()
+    return wrapper
+
+
+def _flushes_writes(func):
+    """Decorate a tool to write buffered changes to storage before it returns."""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            await _m_flush()
+    return wrapper
+
+
+# Completion of the most recently started write tool; each write waits for the
+# one before it, so writes reach the manager in the order they were called
+_last_write: Optional[asyncio.Future] = None
+
+
+@contextlib.asynccontextmanager
+async def _write_turn():
+    """
+    Take a write tool's place in line.
+    
+    Enter right after taking `_WRITE_SEM`, with no other await before it. The
+    semaphore grants slots first come, first served, so turns follow the order
+    the tools were called in, and the earliest unfinished turn always holds a
+    slot. The body may validate its arguments concurrently with other writes,
+    then awaits the yielded function before touching the manager; that returns
+    once every earlier write has finished.
+    """
+    global _last_write
+    previous = _last_write
+    done = asyncio.get_running_loop().create_future()
+    _last_write = done
+    
+    async def wait_turn() -> None:
+        if previous is not None and not previous.done():
+            await asyncio.shield(previous)
+    
+    try:
+        yield wait_turn
+    finally:
+        # Writes behind us may only start once everything before us is done too
+        if previous is None or previous.done():
+            done.set_result(None)
+        else:
+            previous.add_done_callback(lambda _: done.set_result(None))
+
+
+def _build_obs_request(obs_data: Dict[str, Any]) -> AddObservationRequest:
+    """Validate one add_observations argument object."""
+    if "entityName" not in obs_data or "contents" not in obs_data:
+        raise ValueError("Missing required fields: entityName and contents")
+    
+    # Mixed content types: strings and ObservationInput objects
+    return AddObservationRequest(
+        entity_name=obs_data["entityName"],
+        contents=_OBS_CONTENTS_ADAPTER.validate_python(obs_data["contents"])
+    )
+
+
+def _build_obs_requests(observations: List[Dict[str, Any]]) -> List[AddObservationRequest]:
+    """Validate add_observations arguments; called through `asyncio.to_thread`."""
+    return [_build_obs_request(obs_data) for obs_data in observations]
+
+
+@_invalidates_read_cache
+async def _create_entities_impl(entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Run the create_entities tool."""
+    try:
+        async with _WRITE_SEM, _write_turn() as wait_turn:
+            # Validation is CPU-bound; keep it off the event loop
+            entity_objects = await asyncio.to_thread(_ENTITY_LIST_ADAPTER.validate_python, entities)
+            
+            await wait_turn()
+            result = await _m_create_entities(entity_objects)
+        return _ENTITY_LIST_ADAPTER.dump_python(result, mode="json")
+    except ValidationError as e:
+        raise ValueError(f"Invalid entity data: {e}")
+    except Exception as e:
+        raise RuntimeError(f"Failed to create entities: {e}")
 
-@mcp.tool
+
+@_flushes_writes
 async def create_entities(entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Create multiple new entities in the knowledge graph.
     
@@ -111,22 +287,27 @@ async def create_entities(entities: List[Dict[str, Any]]) -> List[Dict[str, Any]
     Returns:
         List of created entity objects
     """
+    return await _create_entities_impl(entities)
+
+
+@_invalidates_read_cache
+async def _create_relations_impl(relations: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """Run the create_relations tool."""
     try:
-        entity_objects = []
-        for entity_data in entities:
-            try:
-                entity_objects.append(Entity(**entity_data))
-            except Exception as e:
-                raise ValueError(f"Invalid entity data: {e}")
-        
-        result = await manager.create_entities(entity_objects)
-        logger.debug("🛠️ Tool registered: create_entities")
-        return [e.dict() for e in result]
+        async with _WRITE_SEM, _write_turn() as wait_turn:
+            # Validation is CPU-bound; keep it off the event loop
+            relation_objects = await asyncio.to_thread(_RELATION_LIST_ADAPTER.validate_python, relations)
+            
+            await wait_turn()
+            result = await _m_create_relations(relation_objects)
+        return _RELATION_LIST_ADAPTER.dump_python(result, mode="json")
+    except ValidationError as e:
+        raise ValueError(f"Invalid relation data: {e}")
     except Exception as e:
-        raise RuntimeError(f"Failed to create entities: {e}")
+        raise RuntimeError(f"Failed to create relations: {e}")
 
 
-@mcp.tool
+@_flushes_writes
 async def create_relations(relations: List[Dict[str, str]]) -> List[Dict[str, str]]:
     """Create multiple new relations between entities in the knowledge graph. Relations should be in active voice.
     
@@ -136,22 +317,27 @@ async def create_relations(relations: List[Dict[str, str]]) -> List[Dict[str, st
     Returns:
         List of created relation objects
     """
+    return await _create_relations_impl(relations)
+
+
+@_invalidates_read_cache
+async def _add_observations_impl(observations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Run the add_observations tool."""
     try:
-        relation_objects = []
-        for relation_data in relations:
-            try:
-                relation_objects.append(Relation(**relation_data))
-            except Exception as e:
-                raise ValueError(f"Invalid relation data: {e}")
-        
-        result = await manager.create_relations(relation_objects)
-        logger.debug("🛠️ Tool registered: create_relations")
-        return [r.dict() for r in result]
+        async with _WRITE_SEM, _write_turn() as wait_turn:
+            # Validation is CPU-bound; keep it off the event loop
+            requests = await asyncio.to_thread(_build_obs_requests, observations)
+            
+            await wait_turn()
+            result = await _m_add_observations(requests)
+        return _OBS_RESULT_LIST_ADAPTER.dump_python(result, mode="json")
+    except ValidationError as e:
+        raise ValueError(f"Invalid observation content: {e}")
     except Exception as e:
-        raise RuntimeError(f"Failed to create relations: {e}")
+        raise RuntimeError(f"Failed to add observations: {e}")
 
 
-@mcp.tool
+@_flushes_writes
 async def add_observations(observations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Add new observations to existing entities in the knowledge graph. Supports both simple strings and temporal observations with durability metadata (permanent, long-term, short-term, temporary).
     
@@ -161,53 +347,52 @@ async def add_observations(observations: List[Dict[str, Any]]) -> List[Dict[str,
     Returns:
         List of processed observation request objects
     """
+    return await _add_observations_impl(observations)
+
+
+@_invalidates_read_cache
+async def _cleanup_outdated_observations_impl() -> Dict[str, Any]:
+    """Run the cleanup_outdated_observations tool."""
     try:
-        requests = []
-        for obs_data in observations:
-            if "entityName" not in obs_data or "contents" not in obs_data:
-                raise ValueError("Missing required fields: entityName and contents")
-            
-            # Handle mixed content types (strings and objects)
-            contents = []
-            for content in obs_data["contents"]:
-                if isinstance(content, str):
-                    contents.append(content)
-                elif isinstance(content, dict):
-                    try:
-                        contents.append(ObservationInput(**content))
-                    except Exception as e:
-                        raise ValueError(f"Invalid observation content: {e}")
-                else:
-                    raise ValueError(f"Invalid content type: {type(content)}")
-            
-            requests.append(AddObservationRequest(
-                entity_name=obs_data["entityName"],
-                contents=contents
-            ))
-        
-        result = await manager.add_observations(requests)
-        logger.debug("🛠️ Tool registered: add_observations")
-        return [r.model_dump() for r in result]
+        async with _WRITE_SEM, _write_turn() as wait_turn:
+            await wait_turn()
+            result = await _m_cleanup_outdated_observations()
+        return result.model_dump(mode="json")
     except Exception as e:
-        raise RuntimeError(f"Failed to add observations: {e}")
+        raise RuntimeError(f"Failed to cleanup observations: {e}")
 
 
-@mcp.tool
+@_flushes_writes
 async def cleanup_outdated_observations() -> Dict[str, Any]:
     """Remove observations that are likely outdated based on their durability and age.
     
     Returns:
         Summary of cleanup operation
     """
+    return await _cleanup_outdated_observations_impl()
+
+
+async def _get_observations_by_durability_impl(entityName: str) -> Dict[str, Any]:
+    """Run the get_observations_by_durability tool."""
     try:
-        result = await manager.cleanup_outdated_observations()
-        logger.debug("🛠️ Tool registered: cleanup_outdated_observations")
-        return result.model_dump()
+        if not entityName:
+            raise ValueError("entityName must be a non-empty string")
+        
+        key = ("get_observations_by_durability", entityName)
+        cached = _READ_CACHE.get(key)
+        if cached is not None:
+            return cached
+        
+        generation = _read_cache_generation
+        result = await _m_get_observations_by_durability(entityName)
+        data = result.model_dump(mode="json")
+        if generation == _read_cache_generation:
+            _READ_CACHE[key] = data
+        return data
     except Exception as e:
-        raise RuntimeError(f"Failed to cleanup observations: {e}")
+        raise RuntimeError(f"Failed to get observations: {e}")
 
 
-@mcp.tool
 async def get_observations_by_durability(entityName: str) -> Dict[str, Any]:
     """Get observations for an entity grouped by their durability type.
     
@@ -217,18 +402,25 @@ async def get_observations_by_durability(entityName: str) -> Dict[str, Any]:
     Returns:
         Observations grouped by durability type
     """
+    return await _get_observations_by_durability_impl(entityName)
+
+
+@_invalidates_read_cache
+async def _delete_entities_impl(entityNames: List[str]) -> str:
+    """Run the delete_entities tool."""
     try:
-        if not entityName or not isinstance(entityName, str):
-            raise ValueError("entityName must be a non-empty string")
+        if not entityNames:
+            raise ValueError("entityNames must be a non-empty list")
         
-        result = await manager.get_observations_by_durability(entityName)
-        logger.debug("🛠️ Tool registered: get_observations_by_durability")
-        return result.model_dump()
+        async with _WRITE_SEM, _write_turn() as wait_turn:
+            await wait_turn()
+            await _m_delete_entities(entityNames)
+        return "Entities deleted successfully"
     except Exception as e:
-        raise RuntimeError(f"Failed to get observations: {e}")
+        raise RuntimeError(f"Failed to delete entities: {e}")
 
 
-@mcp.tool
+@_flushes_writes
 async def delete_entities(entityNames: List[str]) -> str:
     """Delete multiple entities and their associated relations from the knowledge graph.
     
@@ -238,18 +430,27 @@ async def delete_entities(entityNames: List[str]) -> str:
     Returns:
         Success message
     """
+    return await _delete_entities_impl(entityNames)
+
+
+@_invalidates_read_cache
+async def _delete_observations_impl(deletions: List[Dict[str, Any]]) -> str:
+    """Run the delete_observations tool."""
     try:
-        if not entityNames or not isinstance(entityNames, list):
-            raise ValueError("entityNames must be a non-empty list")
-        
-        await manager.delete_entities(entityNames)
-        logger.debug("🛠️ Tool registered: delete_entities")
-        return "Entities deleted successfully"
+        async with _WRITE_SEM, _write_turn() as wait_turn:
+            # Validation is CPU-bound; keep it off the event loop
+            deletion_objects = await asyncio.to_thread(_DELETION_LIST_ADAPTER.validate_python, deletions)
+            
+            await wait_turn()
+            await _m_delete_observations(deletion_objects)
+        return "Observations deleted successfully"
+    except ValidationError as e:
+        raise ValueError(f"Invalid deletion data: {e}")
     except Exception as e:
-        raise RuntimeError(f"Failed to delete entities: {e}")
+        raise RuntimeError(f"Failed to delete observations: {e}")
 
 
-@mcp.tool
+@_flushes_writes
 async def delete_observations(deletions: List[Dict[str, Any]]) -> str:
     """Delete specific observations from entities in the knowledge graph.
     
@@ -259,22 +460,27 @@ async def delete_observations(deletions: List[Dict[str, Any]]) -> str:
     Returns:
         Success message
     """
+    return await _delete_observations_impl(deletions)
+
+
+@_invalidates_read_cache
+async def _delete_relations_impl(relations: List[Dict[str, str]]) -> str:
+    """Run the delete_relations tool."""
     try:
-        deletion_objects = []
-        for deletion_data in deletions:
-            try:
-                deletion_objects.append(DeleteObservationRequest(**deletion_data))
-            except Exception as e:
-                raise ValueError(f"Invalid deletion data: {e}")
-        
-        await manager.delete_observations(deletion_objects)
-        logger.debug("🛠️ Tool registered: delete_observations")
-        return "Observations deleted successfully"
+        async with _WRITE_SEM, _write_turn() as wait_turn:
+            # Validation is CPU-bound; keep it off the event loop
+            relation_objects = await asyncio.to_thread(_RELATION_LIST_ADAPTER.validate_python, relations)
+            
+            await wait_turn()
+            await _m_delete_relations(relation_objects)
+        return "Relations deleted successfully"
+    except ValidationError as e:
+        raise ValueError(f"Invalid relation data: {e}")
     except Exception as e:
-        raise RuntimeError(f"Failed to delete observations: {e}")
+        raise RuntimeError(f"Failed to delete relations: {e}")
 
 
-@mcp.tool
+@_flushes_writes
 async def delete_relations(relations: List[Dict[str, str]]) -> str:
     """Delete multiple relations from the knowledge graph.
     
@@ -284,38 +490,42 @@ async def delete_relations(relations: List[Dict[str, str]]) -> str:
     Returns:
         Success message
     """
+    return await _delete_relations_impl(relations)
+
+
+async def _read_graph_impl() -> KnowledgeGraph:
+    """Run the read_graph tool for batch_execute."""
     try:
-        relation_objects = []
-        for relation_data in relations:
-            try:
-                relation_objects.append(Relation(**relation_data))
-            except Exception as e:
-                raise ValueError(f"Invalid relation data: {e}")
-        
-        await manager.delete_relations(relation_objects)
-        logger.debug("🛠️ Tool registered: delete_relations")
-        return "Relations deleted successfully"
+        return await _m_read_graph()
     except Exception as e:
-        raise RuntimeError(f"Failed to delete relations: {e}")
+        raise RuntimeError(f"Failed to read graph: {e}")
 
 
-@mcp.tool
-async def read_graph() -> Dict[str, Any]:
+async def read_graph() -> str:
     """Read the entire knowledge graph.
     
     Returns:
         Complete knowledge graph data
     """
     try:
-        result = await manager.read_graph()
-        logger.debug("🛠️ Tool registered: read_graph")
-        return result.dict()
+        # Encoded by the manager, which reuses the text while the graph is unchanged
+        return await _m_read_graph_json()
     except Exception as e:
         raise RuntimeError(f"Failed to read graph: {e}")
 
 
-@mcp.tool
-async def search_nodes(query: str) -> Dict[str, Any]:
+async def _search_nodes_impl(query: str) -> KnowledgeGraph:
+    """Run the search_nodes tool."""
+    try:
+        if not query:
+            raise ValueError("query must be a non-empty string")
+        
+        return await _m_search_nodes(query)
+    except Exception as e:
+        raise RuntimeError(f"Failed to search nodes: {e}")
+
+
+async def search_nodes(query: str) -> str:
     """Search for nodes in the knowledge graph based on a query.
     
     Args:
@@ -324,19 +534,32 @@ async def search_nodes(query: str) -> Dict[str, Any]:
     Returns:
         Search results containing matching nodes
     """
+    result = await _search_nodes_impl(query)
+    # One pass straight to JSON text, off the event loop
+    return await asyncio.to_thread(result.model_dump_json)
+
+
+async def _open_nodes_impl(names: List[str]) -> KnowledgeGraph:
+    """Run the open_nodes tool."""
     try:
-        if not query or not isinstance(query, str):
-            raise ValueError("query must be a non-empty string")
+        if not names:
+            raise ValueError("names must be a non-empty list")
         
-        result = await manager.search_nodes(query)
-        logger.debug("🛠️ Tool registered: search_nodes")
-        return result.dict()
+        key = ("open_nodes", tuple(sorted(set(names))))
+        cached = _READ_CACHE.get(key)
+        if cached is not None:
+            return cached
+        
+        generation = _read_cache_generation
+        result = await _m_open_nodes(names)
+        if generation == _read_cache_generation:
+            _READ_CACHE[key] = result
+        return result
     except Exception as e:
-        raise RuntimeError(f"Failed to search nodes: {e}")
+        raise RuntimeError(f"Failed to open nodes: {e}")
 
 
-@mcp.tool
-async def open_nodes(names: List[str]) -> Dict[str, Any]:
+async def open_nodes(names: List[str]) -> str:
     """Open specific nodes in the knowledge graph by their names.
     
     Args:
@@ -345,32 +568,127 @@ async def open_nodes(names: List[str]) -> Dict[str, Any]:
     Returns:
         Retrieved node data
     """
-    try:
-        if not names or not isinstance(names, list):
-            raise ValueError("names must be a non-empty list")
-        
-        result = await manager.open_nodes(names)
-        logger.debug("🛠️ Tool registered: open_nodes")
-        return result.model_dump()
-    except Exception as e:
-        raise RuntimeError(f"Failed to open nodes: {e}")
+    result = await _open_nodes_impl(names)
+    # One pass straight to JSON text, off the event loop
+    return await asyncio.to_thread(result.model_dump_json)
+
+
+# Tools callable from batch_execute, by name
+_BATCH_TOOLS = {
+    "create_entities": _create_entities_impl,
+    "create_relations": _create_relations_impl,
+    "add_observations": _add_observations_impl,
+    "cleanup_outdated_observations": _cleanup_outdated_observations_impl,
+    "get_observations_by_durability": _get_observations_by_durability_impl,
+    "delete_entities": _delete_entities_impl,
+    "delete_observations": _delete_observations_impl,
+    "delete_relations": _delete_relations_impl,
+    "read_graph": _read_graph_impl,
+    "search_nodes": _search_nodes_impl,
+    "open_nodes": _open_nodes_impl,
+}
+
+
+@_flushes_writes
+async def batch_execute(operations: List[Dict[str, Any]], maxConcurrent: int = 8, stopOnError: bool = False) -> List[Dict[str, Any]]:
+    """Run several knowledge graph tools in a single call.
+
+    Operations may run concurrently; writes are applied in order, but use maxConcurrent=1 when a read must see the writes before it.
+
+    Args:
+        operations: List of objects with a tool name and its arguments, e.g. {"tool": "search_nodes", "arguments": {"query": "Alice"}}
+        maxConcurrent: Maximum number of operations running at once
+        stopOnError: Run the operations one at a time and skip the rest after the first failure
+
+    Returns:
+        One result per operation, in order, with success, and result or error
+    """
+    if maxConcurrent < 1:
+        raise ValueError("maxConcurrent must be at least 1")
+
+    # Stopping on error only means something if each operation starts after the
+    # previous one has finished
+    semaphore = asyncio.Semaphore(1 if stopOnError else maxConcurrent)
+    failed = asyncio.Event()
+
+    async def run(operation: Dict[str, Any]) -> Any:
+        async with semaphore:
+            if stopOnError and failed.is_set():
+                raise RuntimeError("Skipped after an earlier operation failed")
+            try:
+                tool = _BATCH_TOOLS.get(operation.get("tool"))
+                if tool is None:
+                    raise ValueError(f"Unknown tool: {operation.get('tool')}")
+                result = await tool(**operation.get("arguments", {}))
+                if isinstance(result, BaseModel):
+                    # Embedded as an object; the standalone tools send the same data as JSON text
+                    result = await asyncio.to_thread(result.model_dump, mode="json")
+                return result
+            except Exception:
+                failed.set()
+                raise
+
+    outcomes = await asyncio.gather(*(run(op) for op in operations), return_exceptions=True)
+
+    results = []
+    for operation, outcome in zip(operations, outcomes):
+        if isinstance(outcome, Exception):
+            results.append({"tool": operation.get("tool"), "success": False, "error": str(outcome)})
+        else:
+            results.append({"tool": operation.get("tool"), "success": True, "result": outcome})
+    return results
+
+
+# Tools exposed over MCP, with their FastMCP registration options. Tools that
+# return pre-serialized JSON text opt out of structured output, which would
+# otherwise carry a second copy of the payload.
+_TOOLS = [
+    (create_entities, {}),
+    (create_relations, {}),
+    (add_observations, {}),
+    (cleanup_outdated_observations, {}),
+    (get_observations_by_durability, {}),
+    (delete_entities, {}),
+    (delete_observations, {}),
+    (delete_relations, {}),
+    (read_graph, {"output_schema": None}),
+    (search_nodes, {"output_schema": None}),
+    (open_nodes, {"output_schema": None}),
+    (batch_execute, {}),
+]
+
+for _fn, _options in _TOOLS:
+    mcp.tool(_fn, **_options)
 
 
 async def main():
     """Common entry point for the MCP server."""
+    _configure_manager(parse_args().memory_path)
+    # One bounded pool for every asyncio.to_thread offload (validation, storage I/O)
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=os.cpu_count() or 4, thread_name_prefix="iq-mcp")
+    )
     try:
         logger.info("🧠 Starting IQ-MCP server")
         await mcp.run_async(transport="stdio")
     except Exception as e:
         print(f"Server error: {e}", file=sys.stderr)
         sys.exit(1)
+    finally:
+        await _m_flush()
 
 
 def run_sync():
     """Synchronus entry point for the server."""
     logger.debug("Running IQ-MCP from server.py")
-    asyncio.run(main())
+    # uvloop is optional (pip install .[uvloop]); fall back to the default loop
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        asyncio.run(main(), loop_factory=uvloop.new_event_loop)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    run_sync()
\ No newline at end of file
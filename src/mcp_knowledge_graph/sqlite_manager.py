@@ -0,0 +1,665 @@
+"""
+SQLite-backed knowledge graph manager.
+
+Stores the graph in a SQLite database instead of a JSONL file, so mutations
+touch only the affected rows and searches go through an FTS5 trigram index
+instead of scanning every entity. The public API matches
+`KnowledgeGraphManager`, and `import_jsonl` migrates an existing JSONL store.
+"""
+
+import asyncio
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar, Union
+
+import orjson
+
+from .manager import KnowledgeGraphManager, _MAX_AGE
+from .models import (
+    Entity,
+    Relation,
+    KnowledgeGraph,
+    TimestampedObservation,
+    ObservationInput,
+    AddObservationRequest,
+    AddObservationResult,
+    DeleteObservationRequest,
+    CleanupResult,
+    DurabilityGroupedObservations,
+    DurabilityType,
+)
+
+T = TypeVar("T")
+
+# Memory paths with one of these suffixes are stored in SQLite instead of JSONL
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+# Rows keep an integer id so results come back in insertion order, like the
+# JSONL store. `ts` is the parsed timestamp in epoch seconds (NULL when the
+# timestamp can't be parsed) and backs the expiry index used by cleanup.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entities (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    entity_type TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS relations (
+    id INTEGER PRIMARY KEY,
+    from_entity TEXT NOT NULL,
+    to_entity TEXT NOT NULL,
+    relation_type TEXT NOT NULL,
+    UNIQUE (from_entity, to_entity, relation_type)
+);
+CREATE INDEX IF NOT EXISTS relations_to_entity ON relations (to_entity);
+CREATE TABLE IF NOT EXISTS observations (
+    id INTEGER PRIMARY KEY,
+    entity_name TEXT NOT NULL REFERENCES entities (name) ON DELETE CASCADE,
+    content TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    ts REAL,
+    durability TEXT NOT NULL,
+    UNIQUE (entity_name, content)
+);
+CREATE INDEX IF NOT EXISTS observations_expiry ON observations (durability, ts);
+"""
+
+# Search text mirrored into a trigram index by triggers. Entity rows use the
+# negated entity id as rowid and observation rows the observation id, so both
+# are removed by rowid lookups.
+_SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS search_text USING fts5(
+    entity_name UNINDEXED, name, entity_type, content, tokenize = 'trigram'
+);
+CREATE TRIGGER IF NOT EXISTS entities_search_insert AFTER INSERT ON entities BEGIN
+    INSERT INTO search_text (rowid, entity_name, name, entity_type)
+    VALUES (-new.id, new.name, new.name, new.entity_type);
+END;
+CREATE TRIGGER IF NOT EXISTS entities_search_delete AFTER DELETE ON entities BEGIN
+    DELETE FROM search_text WHERE rowid = -old.id;
+END;
+CREATE TRIGGER IF NOT EXISTS observations_search_insert AFTER INSERT ON observations BEGIN
+    INSERT INTO search_text (rowid, entity_name, content)
+    VALUES (new.id, new.entity_name, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS observations_search_delete AFTER DELETE ON observations BEGIN
+    DELETE FROM search_text WHERE rowid = old.id;
+END;
+"""
+
+_INSERT_OBSERVATION = (
+    "INSERT OR IGNORE INTO observations (entity_name, content, timestamp, ts, durability) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+
+
+class SQLiteKnowledgeGraphManager:
+    """
+    Knowledge graph manager persisting to a SQLite database.
+    
+    Every operation is a few indexed statements in one transaction, so nothing
+    is cached in process. Blocking database work runs in a worker thread, one
+    operation at a time.
+    """
+    
+    def __init__(self, memory_file_path: str, fsync: bool = False):
+        """
+        Initialize the knowledge graph manager.
+        
+        Args:
+            memory_file_path: Path to the SQLite database (created if missing)
+            fsync: Sync every commit to disk (``synchronous=FULL``) instead of
+                only at WAL checkpoints
+        """
+        self.memory_file_path = Path(memory_file_path)
+        self.fsync = fsync
+        # Ensure the directory exists
+        self.memory_file_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn: Optional[sqlite3.Connection] = None
+        # False when this SQLite build lacks FTS5 or its trigram tokenizer
+        self._has_fts = False
+        # The connection is shared between worker threads, never used by two at once
+        self._lock = asyncio.Lock()
+        # JSON text of the whole graph and the `PRAGMA data_version` it was encoded at;
+        # dropped by our own writes, which data_version doesn't count
+        self._graph_json: Optional[Tuple[int, str]] = None
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use and make sure the schema exists."""
+        if self._conn is None:
+            conn = sqlite3.connect(self.memory_file_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=FULL" if self.fsync else "PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.executescript(_SCHEMA)
+            try:
+                conn.executescript(_SEARCH_SCHEMA)
+                self._has_fts = True
+            except sqlite3.OperationalError:
+                # search_nodes falls back to scanning the tables
+                self._has_fts = False
+            self._conn = conn
+        return self._conn
+    
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Run a blocking database operation in a worker thread.
+        
+        Args:
+            func: Method taking the connection followed by `args`
+        
+        Raises:
+            RuntimeError: If the database operation fails
+        """
+        async with self._lock:
+            try:
+                return await asyncio.to_thread(lambda: func(self._connect(), *args))
+            except sqlite3.Error as e:
+                raise RuntimeError(f"Database error: {e}")
+    
+    async def _run_write(self, func: Callable[..., T], *args: Any) -> T:
+        """Like `_run`, for operations that may change the graph."""
+        try:
+            return await self._run(func, *args)
+        finally:
+            self._graph_json = None
+    
+    async def flush(self) -> None:
+        """No-op; every change is committed as it is made."""
+    
+    def close(self) -> None:
+        """Close the database connection; it is reopened on next use."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+    
+    
+    @staticmethod
+    def _normalize_observation(obs: Union[str, ObservationInput, TimestampedObservation], now: Optional[datetime] = None) -> TimestampedObservation:
+        """
+        Convert an observation to TimestampedObservation format.
+        
+        Strings and ObservationInput objects are stamped with the current time;
+        strings default to long-term durability.
+        
+        Args:
+            obs: A string, ObservationInput or TimestampedObservation
+            now: Naive local time shared by a batch (defaults to the current time)
+        
+        Returns:
+            TimestampedObservation with appropriate metadata
+        """
+        if isinstance(obs, TimestampedObservation):
+            return obs
+        if isinstance(obs, str):
+            return TimestampedObservation.create_now(content=obs, durability=DurabilityType.LONG_TERM, now=now)
+        return TimestampedObservation.create_now(
+            content=obs.content,
+            durability=obs.durability or DurabilityType.LONG_TERM,
+            now=now
+        )
+    
+    @staticmethod
+    def _observation_row(entity_name: str, obs: TimestampedObservation) -> Tuple[str, str, str, Optional[float], str]:
+        """Return the values `_INSERT_OBSERVATION` stores for an observation."""
+        parsed = obs.parsed_timestamp
+        return (
+            entity_name,
+            obs.content,
+            obs.timestamp,
+            parsed.timestamp() if parsed is not None else None,
+            obs.durability.value,
+        )
+    
+    @staticmethod
+    def _observation_from_row(content: str, timestamp: str, durability: str) -> TimestampedObservation:
+        """Build an observation from a row written by this module."""
+        return TimestampedObservation.model_construct(
+            content=content,
+            timestamp=timestamp,
+            durability=DurabilityType(durability),
+        )
+    
+    @staticmethod
+    def _json_list(values: Iterable[str]) -> str:
+        """Encode values for a `json_each(?)` parameter."""
+        return orjson.dumps(list(values)).decode()
+    
+    def _insert_entities(self, conn: sqlite3.Connection, entities: List[Entity]) -> List[Entity]:
+        """
+        Insert entities whose names are new, with their observations.
+        
+        Args:
+            conn: Open connection, inside a transaction
+            entities: Entities to insert
+        
+        Returns:
+            The entities that were inserted, observations normalized
+        """
+        created = []
+        now = datetime.now()
+        for entity in entities:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO entities (name, entity_type) VALUES (?, ?)",
+                (entity.name, entity.entity_type),
+            )
+            if cursor.rowcount == 0:
+                continue  # Name already exists
+            entity.observations = [self._normalize_observation(obs, now) for obs in entity.observations]
+            conn.executemany(
+                _INSERT_OBSERVATION,
+                [self._observation_row(entity.name, obs) for obs in entity.observations],
+            )
+            created.append(entity)
+        return created
+    
+    def _insert_relations(self, conn: sqlite3.Connection, relations: List[Relation]) -> List[Relation]:
+        """
+        Insert relations that don't exist yet.
+        
+        Args:
+            conn: Open connection, inside a transaction
+            relations: Relations to insert
+        
+        Returns:
+            The relations that were inserted
+        """
+        created = []
+        for relation in relations:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO relations (from_entity, to_entity, relation_type) VALUES (?, ?, ?)",
+                (relation.from_entity, relation.to_entity, relation.relation_type),
+            )
+            if cursor.rowcount:
+                created.append(relation)
+        return created
+    
+    def _select_graph(self, conn: sqlite3.Connection, names: Optional[List[str]] = None) -> KnowledgeGraph:
+        """
+        Build a graph from the database, in insertion order.
+        
+        Args:
+            conn: Open connection
+            names: Only include these entities and the relations between them
+                (everything when None)
+        
+        Returns:
+            The selected part of the knowledge graph
+        """
+        if names is None:
+            entity_rows = conn.execute("SELECT name, entity_type FROM entities ORDER BY id")
+            observation_rows = conn.execute(
+                "SELECT entity_name, content, timestamp, durability FROM observations ORDER BY id"
+            )
+            relation_rows = conn.execute(
+                "SELECT from_entity, to_entity, relation_type FROM relations ORDER BY id"
+            )
+        else:
+            names_json = self._json_list(names)
+            entity_rows = conn.execute(
+                "SELECT name, entity_type FROM entities "
+                "WHERE name IN (SELECT value FROM json_each(?)) ORDER BY id",
+                (names_json,),
+            )
+            observation_rows = conn.execute(
+                "SELECT entity_name, content, timestamp, durability FROM observations "
+                "WHERE entity_name IN (SELECT value FROM json_each(?)) ORDER BY id",
+                (names_json,),
+            )
+            relation_rows = conn.execute(
+                "SELECT from_entity, to_entity, relation_type FROM relations "
+                "WHERE from_entity IN (SELECT value FROM json_each(?1)) "
+                "AND to_entity IN (SELECT value FROM json_each(?1)) ORDER BY id",
+                (names_json,),
+            )
+        
+        entities = []
+        entities_by_name: Dict[str, Entity] = {}
+        for name, entity_type in entity_rows.fetchall():
+            entity = Entity.model_construct(name=name, entity_type=entity_type, observations=[])
+            entities.append(entity)
+            entities_by_name[name] = entity
+        for entity_name, content, timestamp, durability in observation_rows.fetchall():
+            entities_by_name[entity_name].observations.append(
+                self._observation_from_row(content, timestamp, durability)
+            )
+        relations = [
+            Relation.model_construct(from_entity=from_entity, to_entity=to_entity, relation_type=relation_type)
+            for from_entity, to_entity, relation_type in relation_rows.fetchall()
+        ]
+        return KnowledgeGraph.model_construct(entities=entities, relations=relations)
+    
+    async def create_entities(self, entities: List[Entity]) -> List[Entity]:
+        """
+        Create multiple new entities in the knowledge graph.
+        
+        Args:
+            entities: List of entities to create
+        
+        Returns:
+            List of entities that were actually created (excludes existing names)
+        """
+        def create(conn: sqlite3.Connection) -> List[Entity]:
+            with conn:
+                return self._insert_entities(conn, entities)
+        
+        return await self._run_write(create)
+    
+    async def create_relations(self, relations: List[Relation]) -> List[Relation]:
+        """
+        Create multiple new relations between entities.
+        
+        Args:
+            relations: List of relations to create
+        
+        Returns:
+            List of relations that were actually created (excludes duplicates)
+        """
+        def create(conn: sqlite3.Connection) -> List[Relation]:
+            with conn:
+                return self._insert_relations(conn, relations)
+        
+        return await self._run_write(create)
+    
+    async def add_observations(self, requests: List[AddObservationRequest]) -> List[AddObservationResult]:
+        """
+        Add new observations to existing entities with temporal metadata.
+        
+        Args:
+            requests: List of observation addition requests
+        
+        Returns:
+            List of results showing what was actually added
+        
+        Raises:
+            ValueError: If an entity is not found
+        """
+        def add(conn: sqlite3.Connection) -> List[AddObservationResult]:
+            # Check every entity before writing anything
+            requested_names = {request.entity_name for request in requests}
+            existing_names = {
+                name for (name,) in conn.execute(
+                    "SELECT name FROM entities WHERE name IN (SELECT value FROM json_each(?))",
+                    (self._json_list(requested_names),),
+                )
+            }
+            for request in requests:
+                if request.entity_name not in existing_names:
+                    raise ValueError(f"Entity with name {request.entity_name} not found")
+            
+            results = []
+            # One timestamp for the whole batch
+            now = datetime.now()
+            with conn:
+                for request in requests:
+                    new_timestamped_obs = [
+                        self._normalize_observation(content, now) for content in request.contents
+                    ]
+                    
+                    # Filter out duplicates, including repeats within this request
+                    existing_contents = {
+                        content for (content,) in conn.execute(
+                            "SELECT content FROM observations WHERE entity_name = ? "
+                            "AND content IN (SELECT value FROM json_each(?))",
+                            (request.entity_name, self._json_list(obs.content for obs in new_timestamped_obs)),
+                        )
+                    }
+                    unique_new_obs = []
+                    for obs in new_timestamped_obs:
+                        if obs.content not in existing_contents:
+                            existing_contents.add(obs.content)
+                            unique_new_obs.append(obs)
+                    
+                    conn.executemany(
+                        _INSERT_OBSERVATION,
+                        [self._observation_row(request.entity_name, obs) for obs in unique_new_obs],
+                    )
+                    results.append(AddObservationResult(
+                        entity_name=request.entity_name,
+                        added_observations=unique_new_obs
+                    ))
+            return results
+        
+        return await self._run_write(add)
+    
+    async def cleanup_outdated_observations(self, max_details: Optional[int] = None) -> CleanupResult:
+        """
+        Remove observations that are likely outdated based on durability and age.
+        
+        Each durability class is one indexed delete on (durability, ts).
+        
+        Args:
+            max_details: Report details for at most this many removed observations
+                (all of them when None); the removal count is always complete
+        
+        Returns:
+            CleanupResult with details of what was removed
+        """
+        def cleanup(conn: sqlite3.Connection) -> CleanupResult:
+            now = datetime.now().astimezone()
+            now_ts = now.timestamp()
+            total_removed = 0
+            removed_details = []
+            
+            with conn:
+                for durability, max_age in _MAX_AGE.items():
+                    cutoff_ts = (now - max_age).timestamp()
+                    remaining = None if max_details is None else max_details - len(removed_details)
+                    if remaining is None or remaining > 0:
+                        rows = conn.execute(
+                            "SELECT entity_name, content, ts FROM observations "
+                            "WHERE durability = ? AND ts < ? ORDER BY id LIMIT ?",
+                            (durability.value, cutoff_ts, -1 if remaining is None else remaining),
+                        )
+                        removed_details.extend(
+                            {
+                                "entityName": entity_name,
+                                "content": content,
+                                "age": f"{int((now_ts - ts) // 86400)} days old",
+                            }
+                            for entity_name, content, ts in rows
+                        )
+                    cursor = conn.execute(
+                        "DELETE FROM observations WHERE durability = ? AND ts < ?",
+                        (durability.value, cutoff_ts),
+                    )
+                    total_removed += cursor.rowcount
+            
+            (entities_processed,) = conn.execute("SELECT count(*) FROM entities").fetchone()
+            return CleanupResult(
+                entities_processed=entities_processed,
+                observations_removed=total_removed,
+                removed_observations=removed_details
+            )
+        
+        return await self._run_write(cleanup)
+    
+    async def get_observations_by_durability(self, entity_name: str) -> DurabilityGroupedObservations:
+        """
+        Get observations for an entity grouped by durability type.
+        
+        Args:
+            entity_name: The name of the entity to get observations for
+        
+        Returns:
+            Observations grouped by durability type
+        
+        Raises:
+            ValueError: If the entity is not found
+        """
+        def group(conn: sqlite3.Connection) -> DurabilityGroupedObservations:
+            if conn.execute("SELECT 1 FROM entities WHERE name = ?", (entity_name,)).fetchone() is None:
+                raise ValueError(f"Entity {entity_name} not found")
+            
+            grouped = DurabilityGroupedObservations()
+            groups = {
+                DurabilityType.PERMANENT: grouped.permanent,
+                DurabilityType.LONG_TERM: grouped.long_term,
+                DurabilityType.SHORT_TERM: grouped.short_term,
+                DurabilityType.TEMPORARY: grouped.temporary,
+            }
+            rows = conn.execute(
+                "SELECT content, timestamp, durability FROM observations WHERE entity_name = ? ORDER BY id",
+                (entity_name,),
+            )
+            for content, timestamp, durability in rows:
+                obs = self._observation_from_row(content, timestamp, durability)
+                groups[obs.durability].append(obs)
+            return grouped
+        
+        return await self._run(group)
+    
+    async def delete_entities(self, entity_names: List[str]) -> None:
+        """
+        Delete multiple entities and their associated relations.
+        
+        Observations are removed with their entity by the foreign key.
+        
+        Args:
+            entity_names: List of entity names to delete
+        """
+        def delete(conn: sqlite3.Connection) -> None:
+            names_json = self._json_list(entity_names)
+            with conn:
+                conn.execute(
+                    "DELETE FROM entities WHERE name IN (SELECT value FROM json_each(?))",
+                    (names_json,),
+                )
+                conn.execute(
+                    "DELETE FROM relations WHERE from_entity IN (SELECT value FROM json_each(?1)) "
+                    "OR to_entity IN (SELECT value FROM json_each(?1))",
+                    (names_json,),
+                )
+        
+        await self._run_write(delete)
+    
+    async def delete_observations(self, deletions: List[DeleteObservationRequest]) -> None:
+        """
+        Delete specific observations from entities.
+        
+        Args:
+            deletions: List of observation deletion requests
+        """
+        def delete(conn: sqlite3.Connection) -> None:
+            with conn:
+                conn.executemany(
+                    "DELETE FROM observations WHERE entity_name = ? AND content = ?",
+                    [
+                        (deletion.entity_name, content)
+                        for deletion in deletions
+                        for content in deletion.observations
+                    ],
+                )
+        
+        await self._run_write(delete)
+    
+    async def delete_relations(self, relations: List[Relation]) -> None:
+        """
+        Delete multiple relations from the knowledge graph.
+        
+        Args:
+            relations: List of relations to delete
+        """
+        def delete(conn: sqlite3.Connection) -> None:
+            with conn:
+                conn.executemany(
+                    "DELETE FROM relations WHERE from_entity = ? AND to_entity = ? AND relation_type = ?",
+                    [(r.from_entity, r.to_entity, r.relation_type) for r in relations],
+                )
+        
+        await self._run_write(delete)
+    
+    async def read_graph(self) -> KnowledgeGraph:
+        """
+        Read the entire knowledge graph.
+        
+        Returns:
+            The complete knowledge graph
+        """
+        return await self._run(self._select_graph)
+    
+    async def read_graph_json(self) -> str:
+        """
+        Read the entire knowledge graph as JSON text.
+        
+        The text is kept until the database changes, so repeated reads of an
+        unchanged graph skip the queries and serialization.
+        
+        Returns:
+            The complete knowledge graph, encoded with ``model_dump_json``
+        """
+        def read(conn: sqlite3.Connection) -> str:
+            (version,) = conn.execute("PRAGMA data_version").fetchone()
+            if self._graph_json is not None and self._graph_json[0] == version:
+                return self._graph_json[1]
+            text = self._select_graph(conn).model_dump_json()
+            self._graph_json = (version, text)
+            return text
+        
+        return await self._run(read)
+    
+    async def search_nodes(self, query: str) -> KnowledgeGraph:
+        """
+        Search for nodes in the knowledge graph based on a query.
+        
+        Queries of three or more characters use the trigram index; shorter ones
+        (which have no trigrams) scan the tables, case-insensitively for ASCII.
+        
+        Args:
+            query: Search query to match against names, types, and observation content
+        
+        Returns:
+            Filtered knowledge graph containing only matching entities and their relations
+        """
+        def search(conn: sqlite3.Connection) -> KnowledgeGraph:
+            if self._has_fts and len(query) >= 3:
+                # A quoted FTS5 string is matched as a substring by the trigram tokenizer
+                rows = conn.execute(
+                    "SELECT DISTINCT entity_name FROM search_text WHERE search_text MATCH ?",
+                    ('"' + query.replace('"', '""') + '"',),
+                )
+            else:
+                query_lower = query.lower()
+                rows = conn.execute(
+                    "SELECT name FROM entities WHERE instr(lower(name), ?1) OR instr(lower(entity_type), ?1) "
+                    "UNION SELECT entity_name FROM observations WHERE instr(lower(content), ?1)",
+                    (query_lower,),
+                )
+            return self._select_graph(conn, [name for (name,) in rows])
+        
+        return await self._run(search)
+    
+    async def open_nodes(self, names: List[str]) -> KnowledgeGraph:
+        """
+        Open specific nodes in the knowledge graph by their names.
+        
+        Args:
+            names: List of entity names to retrieve
+        
+        Returns:
+            Knowledge graph containing only the specified entities and their relations
+        """
+        return await self._run(self._select_graph, names)
+    
+    async def import_jsonl(self, jsonl_path: str) -> Tuple[int, int]:
+        """
+        Import a JSONL store written by `KnowledgeGraphManager`.
+        
+        Entities whose names already exist and duplicate relations are skipped,
+        so importing the same file twice is harmless.
+        
+        Args:
+            jsonl_path: Path to the JSONL file
+        
+        Returns:
+            Number of entities and relations imported
+        """
+        graph = await KnowledgeGraphManager(jsonl_path).read_graph()
+        
+        def import_graph(conn: sqlite3.Connection) -> Tuple[int, int]:
+            with conn:
+                entities = self._insert_entities(conn, graph.entities)
+                relations = self._insert_relations(conn, graph.relations)
+            return len(entities), len(relations)
+        
+        return await self._run_write(import_graph)
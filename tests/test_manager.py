@@ -0,0 +1,271 @@
+"""Tests for the JSONL storage backend."""
+
+import asyncio
+import json
+import os
+import threading
+
+import pytest
+
+from src.mcp_knowledge_graph import manager as manager_module
+from src.mcp_knowledge_graph.manager import _TRIGRAM_MIN_ENTITIES, KnowledgeGraphManager
+from src.mcp_knowledge_graph.models import (
+    AddObservationRequest,
+    DeleteObservationRequest,
+    DurabilityType,
+    Entity,
+    ObservationInput,
+    Relation,
+    TimestampedObservation,
+)
+
+
+@pytest.fixture
+def memory_path(tmp_path):
+    return str(tmp_path / "memory.jsonl")
+
+
+def _names(graph):
+    return [e.name for e in graph.entities]
+
+
+def _records(memory_path):
+    with open(memory_path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+async def _seed(manager):
+    await manager.create_entities([
+        Entity(name="Alice", entityType="person", observations=["Plays the violin"]),
+        Entity(name="Bob", entityType="person"),
+    ])
+    await manager.create_relations([Relation(**{"from": "Bob", "to": "Alice", "relationType": "knows"})])
+    await manager.add_observations([
+        AddObservationRequest(entity_name="Bob", contents=["Learning Rust", ObservationInput(content="On holiday", durability=DurabilityType.TEMPORARY)]),
+    ])
+
+
+@pytest.mark.asyncio
+async def test_search_after_delete_above_trigram_threshold(memory_path, monkeypatch):
+    build_threads = []
+    
+    class RecordingIndex(manager_module._SearchIndex):
+        def __init__(self, *args, **kwargs):
+            build_threads.append(threading.current_thread())
+            super().__init__(*args, **kwargs)
+    
+    monkeypatch.setattr(manager_module, "_SearchIndex", RecordingIndex)
+    manager = KnowledgeGraphManager(memory_path)
+    count = _TRIGRAM_MIN_ENTITIES + 100
+    names = [f"entity_{i}" for i in range(count)]
+    await manager.create_entities([
+        Entity(name=name, entityType="thing", observations=["red" if i % 2 else "blue"])
+        for i, name in enumerate(names)
+    ])
+    red = [name for i, name in enumerate(names) if i % 2]
+    assert _names(await manager.search_nodes("red")) == red
+    assert manager._search_index.trigrams is not None
+    
+    # Rewrites drop the index; a search racing the delete must not see stale text
+    deleted = set(names[::3])
+    _, during = await asyncio.gather(
+        manager.delete_entities(sorted(deleted)),
+        manager.search_nodes("red"),
+    )
+    assert set(_names(during)) <= set(red)
+    
+    expected = [name for name in red if name not in deleted]
+    assert _names(await manager.search_nodes("red")) == expected
+    assert _names(await manager.search_nodes("entity_3")) == [
+        name for name in names if "entity_3" in name and name not in deleted
+    ]
+    assert _names(await KnowledgeGraphManager(memory_path).search_nodes("red")) == expected
+    # Builds ran in worker threads, never on the event loop
+    assert build_threads and threading.main_thread() not in build_threads
+
+
+@pytest.mark.asyncio
+async def test_malformed_lines_are_skipped_without_writing_to_stdout(memory_path, capsys, caplog):
+    with open(memory_path, "w") as f:
+        f.write('{"type":"entity","name":"Alice","entityType":"person","observations":[]}\n')
+        f.write("not json\n")
+        f.write('{"type":"observation","entityName":"Nobody","content":"x","timestamp":"2025-01-01T00:00:00","durability":"permanent"}\n')
+    
+    graph = await KnowledgeGraphManager(memory_path).read_graph()
+    
+    assert _names(graph) == ["Alice"]
+    assert capsys.readouterr().out == ""
+    assert "Skipping invalid line" in caplog.text
+    assert "unknown entity Nobody" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_appended_records_reload_to_an_equal_graph(memory_path):
+    manager = KnowledgeGraphManager(memory_path)
+    await _seed(manager)
+    
+    # Header, two entities, one relation and two observation records; nothing rewritten
+    assert [r["type"] for r in _records(memory_path)] == ["meta", "entity", "entity", "relation", "observation", "observation"]
+    live = await manager.read_graph()
+    reloaded = await KnowledgeGraphManager(memory_path).read_graph()
+    assert reloaded.model_dump() == live.model_dump()
+    assert isinstance(reloaded.entities[1].observations[1], TimestampedObservation)
+    assert reloaded.entities[1].observations[1].durability == DurabilityType.TEMPORARY
+
+
+@pytest.mark.asyncio
+async def test_duplicates_are_skipped(memory_path):
+    manager = KnowledgeGraphManager(memory_path)
+    await _seed(manager)
+    
+    assert await manager.create_entities([Entity(name="Alice", entityType="robot")]) == []
+    assert await manager.create_relations([Relation(**{"from": "Bob", "to": "Alice", "relationType": "knows"})]) == []
+    result = await manager.add_observations([AddObservationRequest(entity_name="Alice", contents=["Plays the violin", "Sings"])])
+    assert [o.content for o in result[0].added_observations] == ["Sings"]
+    
+    reloaded = await KnowledgeGraphManager(memory_path).read_graph()
+    assert [o.content for o in reloaded.entities[0].observations] == ["Plays the violin", "Sings"]
+    assert len(reloaded.relations) == 1
+
+
+@pytest.mark.asyncio
+async def test_external_modification_invalidates_cache(memory_path):
+    manager = KnowledgeGraphManager(memory_path)
+    await _seed(manager)
+    assert _names(await manager.read_graph()) == ["Alice", "Bob"]
+    
+    with open(memory_path, "a") as f:
+        f.write('{"type":"entity","name":"Carol","entityType":"person","observations":[]}\n')
+    
+    assert _names(await manager.read_graph()) == ["Alice", "Bob", "Carol"]
+    assert "Carol" in await manager.read_graph_json()
+
+
+@pytest.mark.asyncio
+async def test_pending_records_are_flushed_before_a_rewrite(memory_path, monkeypatch):
+    manager = KnowledgeGraphManager(memory_path, batch_size=100)
+    await _seed(manager)
+    assert not os.path.exists(memory_path)
+    assert _names(await manager.read_graph()) == ["Alice", "Bob"]
+    
+    await manager.delete_relations([Relation(**{"from": "Bob", "to": "Alice", "relationType": "knows"})])
+    reloaded = await KnowledgeGraphManager(memory_path).read_graph()
+    assert _names(reloaded) == ["Alice", "Bob"]
+    assert reloaded.relations == []
+    
+    # A failed rewrite must not take buffered records with it
+    await manager.create_entities([Entity(name="Carol", entityType="person")])
+    
+    def fail(graph):
+        raise OSError("disk full")
+    
+    monkeypatch.setattr(manager, "_save_graph_sync", fail)
+    with pytest.raises(RuntimeError, match="disk full"):
+        await manager.delete_entities(["Alice"])
+    assert _names(await KnowledgeGraphManager(memory_path).read_graph()) == ["Alice", "Bob", "Carol"]
+    assert _names(await manager.read_graph()) == ["Alice", "Bob", "Carol"]
+
+
+@pytest.mark.asyncio
+async def test_batched_appends_flush_at_batch_size_and_sync(memory_path, monkeypatch):
+    synced = []
+    real_fsync = os.fsync
+    monkeypatch.setattr(os, "fsync", lambda fd: synced.append(fd) or real_fsync(fd))
+    manager = KnowledgeGraphManager(memory_path, batch_size=3, fsync=True)
+    
+    await manager.create_entities([Entity(name="Alice", entityType="person"), Entity(name="Bob", entityType="person")])
+    assert not os.path.exists(memory_path)
+    await manager.create_entities([Entity(name="Carol", entityType="person")])
+    assert _names(await KnowledgeGraphManager(memory_path).read_graph()) == ["Alice", "Bob", "Carol"]
+    assert len(synced) == 1
+    
+    await manager.create_entities([Entity(name="Dave", entityType="person")])
+    await manager.flush()
+    assert _names(await KnowledgeGraphManager(memory_path).read_graph()) == ["Alice", "Bob", "Carol", "Dave"]
+    assert len(synced) == 2
+
+
+@pytest.mark.asyncio
+async def test_read_graph_json_follows_appends_and_rewrites(memory_path):
+    manager = KnowledgeGraphManager(memory_path, batch_size=100)
+    await _seed(manager)
+    
+    async def check():
+        text = await manager.read_graph_json()
+        assert json.loads(text) == (await manager.read_graph()).model_dump(mode="json")
+        return text
+    
+    # Text isn't reused while records are still buffered
+    first = await check()
+    assert await manager.read_graph_json() is not first
+    await manager.flush()
+    first = await check()
+    assert await manager.read_graph_json() is first
+    
+    await manager.delete_entities(["Alice"])
+    assert "Alice" not in await check()
+    
+    await manager.create_entities([Entity(name="Carol", entityType="person")])
+    assert "Carol" in await check()
+    await manager.flush()
+    await manager.delete_observations([DeleteObservationRequest(entity_name="Bob", observations=["Learning Rust"])])
+    assert "Learning Rust" not in await check()
+
+
+@pytest.mark.asyncio
+async def test_rewrite_is_atomic_and_compacts(memory_path):
+    manager = KnowledgeGraphManager(memory_path)
+    await _seed(manager)
+    
+    await manager.delete_entities(["Alice"])
+    
+    assert not os.path.exists(memory_path + ".tmp")
+    records = _records(memory_path)
+    assert [r["type"] for r in records] == ["meta", "entity"]
+    assert [o["content"] for o in records[1]["observations"]] == ["Learning Rust", "On holiday"]
+
+
+@pytest.mark.asyncio
+async def test_cleanup_removes_only_expired_observations(memory_path):
+    manager = KnowledgeGraphManager(memory_path)
+    old = "2000-01-01T00:00:00"
+    await manager.create_entities([Entity(name="Carol", entityType="person", observations=[
+        TimestampedObservation(content="Visiting Lisbon", timestamp=old, durability=DurabilityType.TEMPORARY),
+        TimestampedObservation(content="Born in Lisbon", timestamp=old, durability=DurabilityType.PERMANENT),
+        "Lives in Lisbon",
+    ])])
+    
+    result = await manager.cleanup_outdated_observations()
+    
+    assert result.observations_removed == 1
+    reloaded = await KnowledgeGraphManager(memory_path).read_graph()
+    assert [o.content for o in reloaded.entities[0].observations] == ["Born in Lisbon", "Lives in Lisbon"]
+
+
+@pytest.mark.asyncio
+async def test_legacy_file_without_meta_header_loads(memory_path):
+    with open(memory_path, "w") as f:
+        f.write('{"type":"entity","name":"Alice","entityType":"person","observations":["Plays the violin",'
+                '{"content":"On holiday","timestamp":"2025-06-01T10:00:00","durability":"temporary"}]}\n')
+        # Older writers left no trailing newline
+        f.write('{"type":"relation","from":"Alice","to":"Alice","relationType":"knows"}')
+    
+    manager = KnowledgeGraphManager(memory_path)
+    graph = await manager.read_graph()
+    
+    assert _names(graph) == ["Alice"]
+    # Plain string observations are upgraded to long-term ones
+    observations = graph.entities[0].observations
+    assert [(o.content, o.durability) for o in observations] == [
+        ("Plays the violin", DurabilityType.LONG_TERM),
+        ("On holiday", DurabilityType.TEMPORARY),
+    ]
+    assert graph.relations[0].relation_type == "knows"
+    
+    # Appending to a legacy file keeps every line readable
+    await manager.create_entities([Entity(name="Bob", entityType="person")])
+    reloaded = await KnowledgeGraphManager(memory_path).read_graph()
+    assert _names(reloaded) == ["Alice", "Bob"]
+    # Legacy strings are stamped at load time, so compare contents only
+    assert [o.content for o in reloaded.entities[0].observations] == ["Plays the violin", "On holiday"]
+    assert len(reloaded.relations) == 1
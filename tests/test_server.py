@@ -0,0 +1,199 @@
+"""Tests for the MCP tool layer in server.py."""
+
+import argparse
+import asyncio
+import json
+
+import pytest
+
+from src.mcp_knowledge_graph import server
+from src.mcp_knowledge_graph.manager import KnowledgeGraphManager
+
+
+@pytest.fixture
+def memory_path(tmp_path, monkeypatch):
+    """Point the server at a fresh JSONL store."""
+    path = str(tmp_path / "memory.jsonl")
+    server._configure_manager(path)
+    # Each test runs on its own event loop
+    monkeypatch.setattr(server, "_WRITE_SEM", asyncio.Semaphore(4))
+    server._last_write = None
+    yield path
+    server._last_write = None
+
+
+def _create(name):
+    return {"tool": "create_entities", "arguments": {"entities": [{"name": name, "entityType": "person"}]}}
+
+
+async def _names(memory_path):
+    """Entity names in the server's graph and in a fresh load of the store."""
+    live = await server.manager.read_graph()
+    stored = await KnowledgeGraphManager(memory_path).read_graph()
+    return [e.name for e in live.entities], [e.name for e in stored.entities]
+
+
+@pytest.mark.asyncio
+async def test_batch_writes_apply_in_submission_order(memory_path):
+    results = await server.batch_execute([
+        _create("Bob"),
+        {"tool": "add_observations", "arguments": {"observations": [{"entityName": "Bob", "contents": ["likes tea"]}]}},
+        {"tool": "delete_entities", "arguments": {"entityNames": ["Bob"]}},
+    ])
+    
+    assert [r["success"] for r in results] == [True, True, True]
+    assert await _names(memory_path) == ([], [])
+
+
+@pytest.mark.asyncio
+async def test_batch_writes_keep_order_beyond_concurrency_limits(memory_path):
+    names = [f"e{i}" for i in range(20)]
+    operations = [_create(name) for name in names]
+    operations.append({"tool": "delete_entities", "arguments": {"entityNames": names[:-1]}})
+    operations.append({"tool": "create_relations", "arguments": {"relations": [{"from": "e19", "to": "e19", "relationType": "knows"}]}})
+    
+    results = await server.batch_execute(operations, maxConcurrent=16)
+    
+    assert all(r["success"] for r in results)
+    assert await _names(memory_path) == (["e19"], ["e19"])
+    graph = await server.manager.read_graph()
+    assert len(graph.relations) == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_validation_does_not_block_later_writes(memory_path):
+    results = await server.batch_execute([
+        {"tool": "create_entities", "arguments": {"entities": [{"name": "Bad"}]}},
+        _create("Bob"),
+    ])
+    
+    assert [r["success"] for r in results] == [False, True]
+    assert await _names(memory_path) == (["Bob"], ["Bob"])
+
+
+@pytest.mark.asyncio
+async def test_stop_on_error_skips_later_operations(memory_path):
+    results = await server.batch_execute([
+        {"tool": "add_observations", "arguments": {"observations": [{"entityName": "Missing", "contents": ["x"]}]}},
+        _create("Bob"),
+        {"tool": "search_nodes", "arguments": {"query": "Bob"}},
+    ], stopOnError=True)
+    
+    assert [r["success"] for r in results] == [False, False, False]
+    assert "Skipped" in results[1]["error"]
+    assert await _names(memory_path) == ([], [])
+
+
+@pytest.mark.asyncio
+async def test_without_stop_on_error_later_operations_run(memory_path):
+    results = await server.batch_execute([
+        {"tool": "add_observations", "arguments": {"observations": [{"entityName": "Missing", "contents": ["x"]}]}},
+        _create("Bob"),
+    ])
+    
+    assert [r["success"] for r in results] == [False, True]
+    assert await _names(memory_path) == (["Bob"], ["Bob"])
+
+
+@pytest.mark.asyncio
+async def test_batch_reads_return_objects(memory_path):
+    await server.create_entities([{"name": "Bob", "entityType": "person", "observations": ["likes tea"]}])
+    
+    results = await server.batch_execute([
+        {"tool": "search_nodes", "arguments": {"query": "tea"}},
+        {"tool": "open_nodes", "arguments": {"names": ["Bob"]}},
+        {"tool": "open_nodes", "arguments": {"names": ["Bob"]}},
+    ], maxConcurrent=1)
+    
+    assert all(r["success"] for r in results)
+    assert results[0]["result"] == json.loads(await server.search_nodes("tea"))
+    assert results[1]["result"] == results[2]["result"] == json.loads(await server.open_nodes(["Bob"]))
+    assert results[0]["result"]["entities"][0]["name"] == "Bob"
+
+
+@pytest.mark.asyncio
+async def test_batch_read_graph_returns_object(memory_path):
+    await server.create_entities([{"name": "Bob", "entityType": "person"}])
+    standalone = await server.read_graph()
+    
+    results = await server.batch_execute([{"tool": "read_graph"}])
+    
+    assert results[0]["success"]
+    assert isinstance(results[0]["result"], dict)
+    assert results[0]["result"] == json.loads(standalone)
+
+
+def test_memory_path_follows_environment(tmp_path, monkeypatch):
+    first = str(tmp_path / "first.jsonl")
+    second = str(tmp_path / "second.db")
+    
+    monkeypatch.setenv("MEMORY_FILE_PATH", first)
+    assert server.get_memory_file_path() == first
+    server._configure_manager(None)
+    assert server.memory_path == first
+    assert isinstance(server.manager, KnowledgeGraphManager)
+    
+    monkeypatch.setenv("MEMORY_FILE_PATH", second)
+    assert server.get_memory_file_path() == second
+    server._configure_manager(None)
+    assert server.memory_path == second
+    assert server._m_read_graph_json == server.manager.read_graph_json
+    
+    # The command line still wins
+    server._configure_manager(first)
+    assert server.memory_path == first
+
+
+@pytest.mark.asyncio
+async def test_write_tools_flush_before_returning(memory_path):
+    assert server.manager.batch_size == server.IQ_WRITE_BATCH > 1
+    
+    await server.create_entities([{"name": "Bob", "entityType": "person"}])
+    
+    assert not server.manager._pending
+    assert await _names(memory_path) == (["Bob"], ["Bob"])
+
+
+@pytest.mark.asyncio
+async def test_write_tools_flush_when_they_raise(memory_path, monkeypatch):
+    class FailingDump:
+        validate_python = staticmethod(server._ENTITY_LIST_ADAPTER.validate_python)
+        
+        @staticmethod
+        def dump_python(*args, **kwargs):
+            raise RuntimeError("boom")
+    
+    monkeypatch.setattr(server, "_ENTITY_LIST_ADAPTER", FailingDump)
+    
+    with pytest.raises(RuntimeError, match="boom"):
+        await server.create_entities([{"name": "Bob", "entityType": "person"}])
+    
+    # The manager accepted the write, so it must be on disk despite the error
+    assert await _names(memory_path) == (["Bob"], ["Bob"])
+
+
+@pytest.mark.asyncio
+async def test_batch_flushes_once(memory_path, monkeypatch):
+    appends = []
+    append = server.manager._append_records_sync
+    monkeypatch.setattr(server.manager, "_append_records_sync", lambda records: (appends.append(len(records)), append(records))[1])
+    
+    await server.batch_execute([_create(f"e{i}") for i in range(50)])
+    
+    assert appends == [50]
+    assert len((await KnowledgeGraphManager(memory_path).read_graph()).entities) == 50
+
+
+@pytest.mark.asyncio
+async def test_main_flushes_on_shutdown(memory_path, monkeypatch):
+    async def run_async(**kwargs):
+        # Buffered straight through the manager, bypassing the tool wrappers
+        await server.manager.create_entities([server.Entity(name="Bob", entityType="person")])
+        assert server.manager._pending
+    
+    monkeypatch.setattr(server, "parse_args", lambda: argparse.Namespace(memory_path=memory_path))
+    monkeypatch.setattr(server.mcp, "run_async", run_async)
+    
+    await server.main()
+    
+    assert await _names(memory_path) == (["Bob"], ["Bob"])
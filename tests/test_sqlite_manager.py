@@ -0,0 +1,150 @@
+"""Tests for the SQLite storage backend."""
+
+import sqlite3
+
+import pytest
+
+from src.mcp_knowledge_graph.manager import KnowledgeGraphManager
+from src.mcp_knowledge_graph.models import (
+    AddObservationRequest,
+    DeleteObservationRequest,
+    DurabilityType,
+    Entity,
+    Relation,
+    TimestampedObservation,
+)
+from src.mcp_knowledge_graph.sqlite_manager import SQLiteKnowledgeGraphManager
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "memory.db")
+
+
+@pytest.fixture
+def manager(db_path):
+    manager = SQLiteKnowledgeGraphManager(db_path)
+    yield manager
+    manager.close()
+
+
+def _names(graph):
+    return [e.name for e in graph.entities]
+
+
+def _count(db_path, sql, *args):
+    """Run a count query on a separate connection."""
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(sql, args).fetchone()[0]
+    finally:
+        conn.close()
+
+
+async def _seed(manager):
+    await manager.create_entities([
+        Entity(name="Alice", entityType="person", observations=["Plays the violin"]),
+        Entity(name="Bob", entityType="person", observations=["Learning Rust"]),
+        Entity(name="Acme_Corp", entityType="organization"),
+    ])
+    await manager.create_relations([
+        Relation(**{"from": "Alice", "to": "Acme_Corp", "relationType": "works_at"}),
+        Relation(**{"from": "Bob", "to": "Alice", "relationType": "knows"}),
+    ])
+
+
+@pytest.mark.asyncio
+async def test_search_follows_added_and_deleted_observations(manager):
+    await _seed(manager)
+    assert _names(await manager.search_nodes("violin")) == ["Alice"]
+    assert _names(await manager.search_nodes("organ")) == ["Acme_Corp"]
+    
+    await manager.add_observations([AddObservationRequest(entity_name="Acme_Corp", contents=["Builds violins"])])
+    assert _names(await manager.search_nodes("violin")) == ["Alice", "Acme_Corp"]
+    
+    await manager.delete_observations([DeleteObservationRequest(entity_name="Alice", observations=["Plays the violin"])])
+    graph = await manager.search_nodes("violin")
+    assert _names(graph) == ["Acme_Corp"]
+    assert graph.relations == []
+
+
+@pytest.mark.asyncio
+async def test_delete_entities_cascades(manager, db_path):
+    await _seed(manager)
+    
+    await manager.delete_entities(["Alice"])
+    
+    graph = await manager.read_graph()
+    assert _names(graph) == ["Bob", "Acme_Corp"]
+    assert graph.relations == []
+    assert _count(db_path, "SELECT count(*) FROM observations WHERE entity_name = ?", "Alice") == 0
+    assert _count(db_path, "SELECT count(*) FROM search_text WHERE entity_name = ?", "Alice") == 0
+    assert _names(await manager.search_nodes("violin")) == []
+    assert _names(await manager.search_nodes("Alice")) == []
+
+
+@pytest.mark.asyncio
+async def test_cleanup_removes_expired_observations_from_search(manager):
+    old = TimestampedObservation(content="Visiting Lisbon", timestamp="2000-01-01T00:00:00", durability=DurabilityType.TEMPORARY)
+    kept = TimestampedObservation(content="Born in Lisbon", timestamp="2000-01-01T00:00:00", durability=DurabilityType.PERMANENT)
+    await manager.create_entities([Entity(name="Carol", entityType="person", observations=[old, kept, "Lives in Lisbon"])])
+    
+    result = await manager.cleanup_outdated_observations()
+    
+    assert result.observations_removed == 1
+    assert result.removed_observations[0]["content"] == "Visiting Lisbon"
+    assert _names(await manager.search_nodes("Visiting")) == []
+    assert _names(await manager.search_nodes("Born in")) == ["Carol"]
+    grouped = await manager.get_observations_by_durability("Carol")
+    assert [o.content for o in grouped.permanent] == ["Born in Lisbon"]
+    assert grouped.temporary == []
+
+
+@pytest.mark.asyncio
+async def test_short_queries_scan_case_insensitively(manager):
+    await _seed(manager)
+    
+    assert _names(await manager.search_nodes("bo")) == ["Bob"]
+    assert _names(await manager.search_nodes("RU")) == ["Bob"]
+
+
+@pytest.mark.asyncio
+async def test_search_without_fts_scans_tables(manager):
+    await _seed(manager)
+    manager._has_fts = False
+    
+    assert _names(await manager.search_nodes("violin")) == ["Alice"]
+    assert _names(await manager.search_nodes("ORGANIZATION")) == ["Acme_Corp"]
+
+
+@pytest.mark.asyncio
+async def test_read_graph_json_follows_writes(manager, db_path):
+    await _seed(manager)
+    first = await manager.read_graph_json()
+    assert await manager.read_graph_json() is first
+    
+    await manager.delete_relations([Relation(**{"from": "Bob", "to": "Alice", "relationType": "knows"})])
+    second = await manager.read_graph_json()
+    assert second != first
+    assert '"knows"' not in second
+    
+    # Changes made by another connection are picked up too
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute("UPDATE entities SET entity_type = 'company' WHERE name = 'Acme_Corp'")
+    conn.close()
+    assert '"company"' in await manager.read_graph_json()
+
+
+@pytest.mark.asyncio
+async def test_import_jsonl_round_trip(manager, tmp_path):
+    jsonl = KnowledgeGraphManager(str(tmp_path / "memory.jsonl"))
+    await _seed(jsonl)
+    expected = await jsonl.read_graph()
+    
+    assert await manager.import_jsonl(str(tmp_path / "memory.jsonl")) == (3, 2)
+    assert (await manager.read_graph()).model_dump() == expected.model_dump()
+    
+    # Importing again skips everything that is already there
+    assert await manager.import_jsonl(str(tmp_path / "memory.jsonl")) == (0, 0)
+    assert _names(await manager.search_nodes("Rust")) == ["Bob"]